@@ -1,16 +1,8 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import json
-import os
-from datetime import datetime, date
-from components.dashboard import render_dashboard
-from components.bmi_calculator import render_bmi_calculator
-from components.workout_planner import render_workout_planner
-from components.pose_detector import render_pose_detector
-from utils.data_loader import load_workout_data, save_workout_history
-from models.lstm_recommender import LSTMRecommender
-from models.body_type_classifier import BodyTypeClassifier
+from collections import deque
+
+# Models and page components are imported where they are used so a rerun
+# only pays for the modules behind the page being shown
 
 # Page configuration
 st.set_page_config(
@@ -20,23 +12,43 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Number of full workout records kept in session_state.workout_history
+WORKOUT_HISTORY_MAXLEN = 64
+
 # Initialize session state
 if 'user_profile' not in st.session_state:
     st.session_state.user_profile = {}
 if 'workout_history' not in st.session_state:
-    st.session_state.workout_history = []
+    # Only recent workouts are kept as full records; workout_history_df keeps
+    # the complete per-workout summary for totals and charts
+    st.session_state.workout_history = deque(maxlen=WORKOUT_HISTORY_MAXLEN)
 if 'current_workout' not in st.session_state:
     st.session_state.current_workout = None
 if 'models_loaded' not in st.session_state:
     st.session_state.models_loaded = False
 
+# Profile selectbox options and their index lookups
+_GENDER_OPTS = ("Male", "Female", "Other")
+_GENDER_IDX = {v: i for i, v in enumerate(_GENDER_OPTS)}
+_GOAL_OPTS = ("Weight Loss", "Muscle Gain", "Endurance", "Strength", "General Fitness")
+_GOAL_IDX = {v: i for i, v in enumerate(_GOAL_OPTS)}
+_ACTIVITY_OPTS = ("Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active")
+_ACTIVITY_IDX = {v: i for i, v in enumerate(_ACTIVITY_OPTS)}
+_EXPERIENCE_OPTS = ("Beginner", "Intermediate", "Advanced")
+_EXPERIENCE_IDX = {v: i for i, v in enumerate(_EXPERIENCE_OPTS)}
+
 def load_models():
-    """Load ML models on first run"""
+    """Attach the shared ML models to this session"""
+    from utils.model_loader import get_lstm_recommender, get_body_classifier
+    
+    # models_loaded only tracks whether this session has shown the spinner;
+    # the model instances themselves are shared through st.cache_resource
     if not st.session_state.models_loaded:
         with st.spinner("Loading AI models..."):
             try:
-                st.session_state.lstm_recommender = LSTMRecommender()
-                st.session_state.body_classifier = BodyTypeClassifier()
+                # Warm the shared instances; pages fetch them from the getters
+                get_lstm_recommender()
+                get_body_classifier()
                 st.session_state.models_loaded = True
                 st.success("AI models loaded successfully!")
             except Exception as e:
@@ -68,12 +80,16 @@ def main():
     
     # Main content area
     if page == "Dashboard":
+        from components.dashboard import render_dashboard
         render_dashboard()
     elif page == "BMI Calculator":
+        from components.bmi_calculator import render_bmi_calculator
         render_bmi_calculator()
     elif page == "Workout Planner":
+        from components.workout_planner import render_workout_planner
         render_workout_planner()
     elif page == "Pose Detection":
+        from components.pose_detector import render_pose_detector
         render_pose_detector()
     elif page == "Profile":
         render_profile_page()
@@ -82,46 +98,45 @@ def render_profile_page():
     """Render user profile configuration page"""
     st.title("👤 User Profile")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Personal Information")
-        name = st.text_input("Name", value=st.session_state.user_profile.get('name', ''))
-        age = st.number_input("Age", min_value=13, max_value=100, 
-                             value=st.session_state.user_profile.get('age', 25))
-        gender = st.selectbox("Gender", ["Male", "Female", "Other"],
-                             index=["Male", "Female", "Other"].index(
-                                 st.session_state.user_profile.get('gender', 'Male')))
-        
-        st.subheader("Fitness Goals")
-        goal = st.selectbox("Primary Goal", 
-                           ["Weight Loss", "Muscle Gain", "Endurance", "Strength", "General Fitness"],
-                           index=["Weight Loss", "Muscle Gain", "Endurance", "Strength", "General Fitness"].index(
-                               st.session_state.user_profile.get('goal', 'General Fitness')))
-        
-        activity_level = st.selectbox("Activity Level",
-                                     ["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"],
-                                     index=["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"].index(
-                                         st.session_state.user_profile.get('activity_level', 'Moderately Active')))
-    
-    with col2:
-        st.subheader("Health Information")
-        injuries = st.text_area("Any injuries or limitations?", 
-                               value=st.session_state.user_profile.get('injuries', ''))
+    # Inputs are batched in a form so editing them doesn't rerun the app
+    with st.form("profile_form"):
+        col1, col2 = st.columns(2)
         
-        experience = st.selectbox("Fitness Experience",
-                                 ["Beginner", "Intermediate", "Advanced"],
-                                 index=["Beginner", "Intermediate", "Advanced"].index(
-                                     st.session_state.user_profile.get('experience', 'Beginner')))
+        with col1:
+            st.subheader("Personal Information")
+            name = st.text_input("Name", value=st.session_state.user_profile.get('name', ''))
+            age = st.number_input("Age", min_value=13, max_value=100, 
+                                 value=st.session_state.user_profile.get('age', 25))
+            gender = st.selectbox("Gender", _GENDER_OPTS,
+                                 index=_GENDER_IDX.get(st.session_state.user_profile.get('gender'), 0))
+            
+            st.subheader("Fitness Goals")
+            goal = st.selectbox("Primary Goal", _GOAL_OPTS,
+                               index=_GOAL_IDX.get(st.session_state.user_profile.get('goal'),
+                                                   _GOAL_IDX['General Fitness']))
+            
+            activity_level = st.selectbox("Activity Level", _ACTIVITY_OPTS,
+                                         index=_ACTIVITY_IDX.get(st.session_state.user_profile.get('activity_level'),
+                                                                 _ACTIVITY_IDX['Moderately Active']))
         
-        st.subheader("Workout Preferences")
-        workout_duration = st.slider("Preferred workout duration (minutes)", 
-                                    15, 120, st.session_state.user_profile.get('workout_duration', 45))
+        with col2:
+            st.subheader("Health Information")
+            injuries = st.text_area("Any injuries or limitations?", 
+                                   value=st.session_state.user_profile.get('injuries', ''))
+            
+            experience = st.selectbox("Fitness Experience", _EXPERIENCE_OPTS,
+                                     index=_EXPERIENCE_IDX.get(st.session_state.user_profile.get('experience'), 0))
+            
+            st.subheader("Workout Preferences")
+            workout_duration = st.slider("Preferred workout duration (minutes)", 
+                                        15, 120, st.session_state.user_profile.get('workout_duration', 45))
+            
+            workout_frequency = st.slider("Workouts per week", 
+                                         1, 7, st.session_state.user_profile.get('workout_frequency', 3))
         
-        workout_frequency = st.slider("Workouts per week", 
-                                     1, 7, st.session_state.user_profile.get('workout_frequency', 3))
+        submitted = st.form_submit_button("Save Profile", type="primary")
     
-    if st.button("Save Profile", type="primary"):
+    if submitted:
         st.session_state.user_profile.update({
             'name': name,
             'age': age,
@@ -1,80 +1,143 @@
 import streamlit as st
+from types import MappingProxyType
 import pandas as pd
+import plotly.express as px
 import plotly.graph_objects as go
-from models.body_type_classifier import BodyTypeClassifier
+from utils.model_loader import get_body_classifier
+
+# Selectbox options and their index lookups
+_HEIGHT_UNIT_OPTS = ("Centimeters", "Feet & Inches")
+_WEIGHT_UNIT_OPTS = ("Kilograms", "Pounds")
+_GENDER_OPTS = ("Male", "Female", "Other")
+_GENDER_IDX = {v: i for i, v in enumerate(_GENDER_OPTS)}
+
+# BMI category descriptions and recommendations
+_BMI_INFO = MappingProxyType({
+    "Underweight": {
+        "description": "Below normal weight range",
+        "recommendations": (
+            "Focus on gaining healthy weight",
+            "Increase caloric intake",
+            "Strength training to build muscle",
+            "Consult healthcare provider"
+        ),
+        "color": "info"
+    },
+    "Normal weight": {
+        "description": "Healthy weight range",
+        "recommendations": (
+            "Maintain current weight",
+            "Continue balanced diet",
+            "Regular exercise routine",
+            "Focus on overall fitness"
+        ),
+        "color": "success"
+    },
+    "Overweight": {
+        "description": "Above normal weight range",
+        "recommendations": (
+            "Gradual weight loss (1-2 lbs/week)",
+            "Increase physical activity",
+            "Reduce caloric intake",
+            "Focus on cardio exercises"
+        ),
+        "color": "warning"
+    },
+    "Obese": {
+        "description": "Significantly above normal weight",
+        "recommendations": (
+            "Consult healthcare provider",
+            "Create sustainable weight loss plan",
+            "Start with low-impact exercises",
+            "Consider nutritional counseling"
+        ),
+        "color": "error"
+    }
+})
 
 def render_bmi_calculator():
     """Render BMI calculator and body type classification"""
     st.title("📊 BMI Calculator & Body Type Analysis")
     
+    profile = st.session_state.user_profile
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
         st.subheader("📏 Calculate Your BMI")
         
         # Input fields
-        height_unit = st.selectbox("Height Unit", ["Centimeters", "Feet & Inches"])
+        height_unit = st.selectbox("Height Unit", _HEIGHT_UNIT_OPTS)
         
-        if height_unit == "Centimeters":
-            height_cm = st.number_input(
-                "Height (cm)", 
-                min_value=100.0, 
-                max_value=250.0, 
-                value=170.0, 
-                step=0.5
-            )
-        else:
-            col_a, col_b = st.columns(2)
-            with col_a:
-                feet = st.number_input("Feet", min_value=3, max_value=8, value=5)
-            with col_b:
-                inches = st.number_input("Inches", min_value=0, max_value=11, value=7)
-            height_cm = (feet * 12 + inches) * 2.54
+        weight_unit = st.selectbox("Weight Unit", _WEIGHT_UNIT_OPTS)
         
-        weight_unit = st.selectbox("Weight Unit", ["Kilograms", "Pounds"])
-        
-        if weight_unit == "Kilograms":
-            weight_kg = st.number_input(
-                "Weight (kg)", 
-                min_value=30.0, 
-                max_value=300.0, 
-                value=70.0, 
-                step=0.1
-            )
-        else:
-            weight_lbs = st.number_input(
-                "Weight (lbs)", 
-                min_value=66, 
-                max_value=660, 
-                value=154, 
-                step=1
-            )
-            weight_kg = weight_lbs * 0.453592
-        
-        age = st.number_input("Age", min_value=13, max_value=100, value=30)
-        gender = st.selectbox("Gender", ["Male", "Female", "Other"])
+        # The unit selectors stay outside the form since they change which
+        # inputs are shown; the measurements are batched so editing them
+        # doesn't rerun the app
+        with st.form("bmi_form"):
+            if height_unit == "Centimeters":
+                height_cm = st.number_input(
+                    "Height (cm)", 
+                    min_value=100.0, 
+                    max_value=250.0, 
+                    value=170.0, 
+                    step=0.5
+                )
+            else:
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    feet = st.number_input("Feet", min_value=3, max_value=8, value=5)
+                with col_b:
+                    inches = st.number_input("Inches", min_value=0, max_value=11, value=7)
+                height_cm = (feet * 12 + inches) * 2.54
+            
+            if weight_unit == "Kilograms":
+                weight_kg = st.number_input(
+                    "Weight (kg)", 
+                    min_value=30.0, 
+                    max_value=300.0, 
+                    value=70.0, 
+                    step=0.1
+                )
+            else:
+                weight_lbs = st.number_input(
+                    "Weight (lbs)", 
+                    min_value=66, 
+                    max_value=660, 
+                    value=154, 
+                    step=1
+                )
+                weight_kg = weight_lbs * 0.453592
+            
+            age = st.number_input("Age", min_value=13, max_value=100, value=30)
+            gender = st.selectbox("Gender", _GENDER_OPTS,
+                                  index=_GENDER_IDX.get(profile.get('gender'), 0))
+            
+            submitted = st.form_submit_button("Calculate BMI & Analyze Body Type", type="primary")
         
         # Calculate BMI
-        if st.button("Calculate BMI & Analyze Body Type", type="primary"):
+        if submitted:
             bmi = weight_kg / ((height_cm / 100) ** 2)
             
-            # Update session state
-            st.session_state.user_profile.update({
+            updates = {
                 'height': height_cm,
                 'weight': weight_kg,
                 'age': age,
                 'gender': gender,
                 'bmi': bmi
-            })
+            }
             
             # Body type classification
             if st.session_state.models_loaded:
-                classifier = st.session_state.body_classifier
+                classifier = get_body_classifier()
                 body_type_result = classifier.predict_body_type(height_cm, weight_kg, age, gender)
                 
-                st.session_state.user_profile['body_type'] = body_type_result['body_type']
-                st.session_state.user_profile['body_type_confidence'] = body_type_result['confidence']
-                st.session_state.user_profile['body_type_probabilities'] = body_type_result['probabilities']
+                updates['body_type'] = body_type_result['body_type']
+                updates['body_type_confidence'] = body_type_result['confidence']
+                updates['body_type_probabilities'] = body_type_result['probabilities']
+            
+            # Update session state
+            profile.update(updates)
             
             st.success("✅ BMI and body type analysis completed!")
             st.rerun()
@@ -82,8 +145,7 @@ def render_bmi_calculator():
     with col2:
         st.subheader("📈 Your Results")
         
-        if 'bmi' in st.session_state.user_profile:
-            profile = st.session_state.user_profile
+        if 'bmi' in profile:
             bmi = profile['bmi']
             
             # BMI Category
@@ -105,14 +167,15 @@ def render_bmi_calculator():
             st.info("👆 Enter your measurements to calculate BMI")
     
     # Body Type Analysis Section
-    if 'body_type' in st.session_state.user_profile:
+    if 'body_type' in profile:
         render_body_type_analysis()
 
-def render_bmi_gauge(bmi):
-    """Render BMI gauge chart"""
+@st.cache_data(show_spinner=False)
+def _build_bmi_gauge(bmi_rounded):
+    """Build the BMI gauge figure as a plain dict so it can be cached"""
     fig = go.Figure(go.Indicator(
         mode = "gauge+number",
-        value = bmi,
+        value = bmi_rounded,
         domain = {'x': [0, 1], 'y': [0, 1]},
         title = {'text': "BMI Scale"},
         gauge = {
@@ -127,60 +190,29 @@ def render_bmi_gauge(bmi):
             'threshold': {
                 'line': {'color': "red", 'width': 4},
                 'thickness': 0.75,
-                'value': bmi
+                'value': bmi_rounded
             }
         }
     ))
     
     fig.update_layout(height=300)
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict()
+
+def render_bmi_gauge(bmi):
+    """Render BMI gauge chart"""
+    # Round before keying the cache so nearby values share one figure
+    bmi_rounded = round(bmi, 1)
+    
+    # Reuse this session's last figure while the BMI is unchanged
+    if st.session_state.get('_last_bmi') != bmi_rounded:
+        st.session_state['_last_fig'] = _build_bmi_gauge(bmi_rounded)
+        st.session_state['_last_bmi'] = bmi_rounded
+    
+    st.plotly_chart(st.session_state['_last_fig'], use_container_width=True)
 
 def render_bmi_info(category):
     """Render BMI category information"""
-    bmi_info = {
-        "Underweight": {
-            "description": "Below normal weight range",
-            "recommendations": [
-                "Focus on gaining healthy weight",
-                "Increase caloric intake",
-                "Strength training to build muscle",
-                "Consult healthcare provider"
-            ],
-            "color": "info"
-        },
-        "Normal weight": {
-            "description": "Healthy weight range",
-            "recommendations": [
-                "Maintain current weight",
-                "Continue balanced diet",
-                "Regular exercise routine",
-                "Focus on overall fitness"
-            ],
-            "color": "success"
-        },
-        "Overweight": {
-            "description": "Above normal weight range",
-            "recommendations": [
-                "Gradual weight loss (1-2 lbs/week)",
-                "Increase physical activity",
-                "Reduce caloric intake",
-                "Focus on cardio exercises"
-            ],
-            "color": "warning"
-        },
-        "Obese": {
-            "description": "Significantly above normal weight",
-            "recommendations": [
-                "Consult healthcare provider",
-                "Create sustainable weight loss plan",
-                "Start with low-impact exercises",
-                "Consider nutritional counseling"
-            ],
-            "color": "error"
-        }
-    }
-    
-    info = bmi_info.get(category, bmi_info["Normal weight"])
+    info = _BMI_INFO.get(category, _BMI_INFO["Normal weight"])
     
     if info["color"] == "success":
         st.success(f"✅ {category}: {info['description']}")
@@ -222,7 +254,7 @@ def render_body_type_analysis():
     with col2:
         # Body type characteristics
         if st.session_state.models_loaded:
-            classifier = st.session_state.body_classifier
+            classifier = get_body_classifier()
             characteristics = classifier.get_body_type_characteristics(body_type)
             
             st.write(f"**{body_type.title()} Characteristics:**")
@@ -254,15 +286,13 @@ def get_bmi_category(bmi):
 
 def render_bmi_history():
     """Render BMI tracking history"""
-    if 'bmi_history' not in st.session_state:
-        st.session_state.bmi_history = []
+    bmi_history = st.session_state.setdefault('bmi_history', [])
     
-    if st.session_state.bmi_history:
+    if bmi_history:
         st.subheader("📈 BMI History")
         
-        df = pd.DataFrame(st.session_state.bmi_history)
+        df = pd.DataFrame(bmi_history)
         
-        import plotly.express as px
         fig = px.line(
             df, 
             x='date', 
@@ -1,11 +1,48 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from utils.data_loader import load_workout_history, calculate_workout_calories
+from datetime import datetime
+from types import MappingProxyType
+from utils.data_loader import (
+    calculate_workout_calories, append_workout_history, get_workout_history_df,
+    recent_workouts
+)
 from utils.pose_detection import pose_manager
 
+# Quick tips shown on the dashboard for each body type
+_BODY_TYPE_TIPS = MappingProxyType({
+    'ectomorph': (
+        "Focus on compound movements to build mass",
+        "Eat frequently throughout the day",
+        "Limit cardio to preserve muscle mass"
+    ),
+    'mesomorph': (
+        "Maintain balanced cardio and strength training",
+        "Vary your workout routines regularly",
+        "Focus on progressive overload"
+    ),
+    'endomorph': (
+        "Include more cardio in your routine",
+        "Focus on high-intensity interval training",
+        "Control portion sizes for better results"
+    )
+})
+
+@st.cache_data(show_spinner=False)
+def _daily_totals(history_df):
+    """Aggregate workouts and calories per calendar day"""
+    daily = (
+        history_df
+        .assign(Workouts=1)
+        .set_index('date')[['Workouts', 'calories']]
+        .resample('D')
+        .sum()
+        .rename(columns={'calories': 'Calories'})
+    )
+    daily.index.name = 'Date'
+    return daily.reset_index()
+
 def render_dashboard():
     """Render the main dashboard"""
     st.title("🏋️ Fitness Dashboard")
@@ -36,7 +73,7 @@ def render_dashboard_metrics():
     
     # Get user stats
     profile = st.session_state.user_profile
-    history = st.session_state.workout_history
+    history_df = get_workout_history_df()
     pose_stats = pose_manager.get_workout_stats()
     
     with col1:
@@ -47,7 +84,7 @@ def render_dashboard_metrics():
         )
     
     with col2:
-        workouts_completed = len(history)
+        workouts_completed = len(history_df)
         st.metric(
             label="Workouts Completed",
             value=workouts_completed,
@@ -64,10 +101,7 @@ def render_dashboard_metrics():
     
     with col4:
         # Calculate total calories from all workouts
-        total_calories = sum(
-            calculate_workout_calories(workout.get('exercises', []), workout.get('duration', 30))
-            for workout in history
-        )
+        total_calories = int(history_df['calories'].sum())
         st.metric(
             label="Calories Burned",
             value=f"{total_calories:,}",
@@ -80,9 +114,10 @@ def render_current_workout_section():
     
     col1, col2 = st.columns([2, 1])
     
+    workout = st.session_state.current_workout
+    
     with col1:
-        if st.session_state.current_workout:
-            workout = st.session_state.current_workout
+        if workout:
             st.success("✅ Workout Plan Ready!")
             
             # Display workout summary
@@ -128,41 +163,29 @@ def render_progress_charts():
     """Render progress visualization charts"""
     st.subheader("📊 Progress Analytics")
     
-    if not st.session_state.workout_history:
+    history_df = get_workout_history_df()
+    
+    if history_df.empty:
         st.info("Complete your first workout to see progress charts!")
         return
     
+    # Build the daily aggregation once and share it with both charts
+    daily = _daily_totals(history_df)
+    
     col1, col2 = st.columns(2)
     
     with col1:
         # Workout frequency chart
-        render_workout_frequency_chart()
+        render_workout_frequency_chart(daily)
     
     with col2:
         # Calories burned over time
-        render_calories_chart()
+        render_calories_chart(daily)
 
-def render_workout_frequency_chart():
+def render_workout_frequency_chart(daily):
     """Render workout frequency over time"""
-    history = st.session_state.workout_history
-    
-    # Create DataFrame from history
-    df_data = []
-    for workout in history:
-        df_data.append({
-            'date': pd.to_datetime(workout.get('date', datetime.now().isoformat())),
-            'completed': 1
-        })
-    
-    if not df_data:
-        return
-    
-    df = pd.DataFrame(df_data)
-    df = df.groupby(df['date'].dt.date)['completed'].sum().reset_index()
-    df.columns = ['Date', 'Workouts']
-    
     fig = px.line(
-        df, 
+        daily, 
         x='Date', 
         y='Workouts',
         title='Daily Workout Frequency',
@@ -171,30 +194,10 @@ def render_workout_frequency_chart():
     fig.update_layout(height=300)
     st.plotly_chart(fig, use_container_width=True)
 
-def render_calories_chart():
+def render_calories_chart(daily):
     """Render calories burned over time"""
-    history = st.session_state.workout_history
-    
-    df_data = []
-    for workout in history:
-        calories = calculate_workout_calories(
-            workout.get('exercises', []), 
-            workout.get('duration', 30)
-        )
-        df_data.append({
-            'date': pd.to_datetime(workout.get('date', datetime.now().isoformat())),
-            'calories': calories
-        })
-    
-    if not df_data:
-        return
-    
-    df = pd.DataFrame(df_data)
-    df = df.groupby(df['date'].dt.date)['calories'].sum().reset_index()
-    df.columns = ['Date', 'Calories']
-    
     fig = px.bar(
-        df, 
+        daily, 
         x='Date', 
         y='Calories',
         title='Daily Calories Burned',
@@ -208,7 +211,7 @@ def render_recent_activity():
     """Render recent workout activity"""
     st.subheader("🕒 Recent Activity")
     
-    history = st.session_state.workout_history
+    history = recent_workouts(5)
     pose_sessions = pose_manager.get_workout_stats()
     
     if not history and not pose_sessions:
@@ -219,7 +222,7 @@ def render_recent_activity():
     all_activities = []
     
     # Add workout history
-    for workout in history[-5:]:  # Last 5 workouts
+    for workout in history:  # Last 5 workouts
         all_activities.append({
             'type': 'Workout Completed',
             'date': workout.get('date', datetime.now().isoformat()),
@@ -228,8 +231,9 @@ def render_recent_activity():
         })
     
     # Add pose detection sessions
-    if 'pose_sessions' in st.session_state:
-        for session in st.session_state.pose_sessions[-3:]:  # Last 3 sessions
+    pose_session_log = st.session_state.get('pose_sessions')
+    if pose_session_log:
+        for session in pose_session_log[-3:]:  # Last 3 sessions
             all_activities.append({
                 'type': 'Pose Detection Session',
                 'date': session.get('timestamp', datetime.now().isoformat()),
@@ -237,11 +241,14 @@ def render_recent_activity():
                 'icon': '📹'
             })
     
-    # Sort by date
-    all_activities.sort(key=lambda x: x['date'], reverse=True)
+    # Parse every date once and sort newest first
+    dates = pd.to_datetime([activity['date'] for activity in all_activities], format='ISO8601')
+    order = np.argsort(dates.values, kind='stable')[::-1][:8]  # Show top 8
+    date_labels = dates[order].strftime('%m/%d %H:%M')
     
     # Display activities
-    for activity in all_activities[:8]:  # Show top 8
+    for idx, date_label in zip(order, date_labels):
+        activity = all_activities[idx]
         col1, col2, col3 = st.columns([1, 3, 2])
         
         with col1:
@@ -252,44 +259,30 @@ def render_recent_activity():
             st.write(activity['details'])
         
         with col3:
-            date_obj = pd.to_datetime(activity['date'])
-            st.write(date_obj.strftime('%m/%d %H:%M'))
+            st.write(date_label)
 
 def mark_workout_complete():
     """Mark current workout as complete and add to history"""
-    if st.session_state.current_workout:
-        workout_data = st.session_state.current_workout.copy()
+    current_workout = st.session_state.current_workout
+    if current_workout:
+        # Annotate in place; current_workout is cleared below
+        workout_data = current_workout
         workout_data['date'] = datetime.now().isoformat()
         workout_data['completed'] = True
+        workout_data['calories'] = calculate_workout_calories(
+            workout_data.get('exercises', []), workout_data.get('duration', 30)
+        )
         
         # Add to history
-        st.session_state.workout_history.append(workout_data)
+        append_workout_history(workout_data)
         
         # Clear current workout
         st.session_state.current_workout = None
         
         st.success("🎉 Workout completed! Great job!")
         st.balloons()
-        st.rerun()
+        st.rerun(scope="app")
 
 def get_body_type_tips(body_type):
     """Get quick tips based on body type"""
-    tips = {
-        'ectomorph': [
-            "Focus on compound movements to build mass",
-            "Eat frequently throughout the day",
-            "Limit cardio to preserve muscle mass"
-        ],
-        'mesomorph': [
-            "Maintain balanced cardio and strength training",
-            "Vary your workout routines regularly",
-            "Focus on progressive overload"
-        ],
-        'endomorph': [
-            "Include more cardio in your routine",
-            "Focus on high-intensity interval training",
-            "Control portion sizes for better results"
-        ]
-    }
-    
-    return tips.get(body_type.lower(), [])
+    return _BODY_TYPE_TIPS.get(body_type.lower(), ())
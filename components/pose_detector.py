@@ -1,126 +1,18 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import json
-from datetime import datetime, timedelta
+import time
+import os
 from utils.pose_detection import pose_manager
 
-def render_pose_detector():
-    """Render pose detection interface"""
-    st.title("📹 AI Pose Detection")
-    
-    # Check camera permissions info
-    st.info("🔒 This feature requires camera access. Please allow camera permissions when prompted.")
-    
-    col1, col2 = st.columns([1, 2])
-    
-    with col1:
-        render_pose_controls()
-    
-    with col2:
-        render_pose_detection_area()
-
-def render_pose_controls():
-    """Render pose detection controls"""
-    st.subheader("🎯 Exercise Selection")
-    
-    # Exercise selection
-    exercise = st.selectbox(
-        "Choose Exercise to Practice",
-        [
-            "Push-ups",
-            "Squats", 
-            "Plank",
-            "Lunges",
-            "Burpees",
-            "Jumping Jacks"
-        ]
-    )
-    
-    # Detection settings
-    st.subheader("⚙️ Detection Settings")
-    
-    confidence_threshold = st.slider(
-        "Confidence Threshold",
-        min_value=0.1,
-        max_value=1.0,
-        value=0.5,
-        step=0.1,
-        help="Higher values require more confident pose detection"
-    )
-    
-    show_keypoints = st.checkbox("Show Keypoints", value=True)
-    show_skeleton = st.checkbox("Show Skeleton", value=True)
-    
-    # Rep counting settings
-    st.subheader("📊 Rep Counting")
-    
-    target_reps = st.number_input(
-        "Target Reps",
-        min_value=1,
-        max_value=100,
-        value=10
-    )
-    
-    # Control buttons
-    st.subheader("🎮 Controls")
-    
-    col_a, col_b = st.columns(2)
-    
-    with col_a:
-        if st.button("▶️ Start Detection", type="primary"):
-            start_pose_detection(exercise, confidence_threshold, target_reps)
-    
-    with col_b:
-        if st.button("⏹️ Stop Detection"):
-            stop_pose_detection()
-    
-    # Current session info
-    if pose_manager.is_detecting:
-        st.success(f"🟢 Detecting: {pose_manager.current_exercise}")
-        st.metric("Current Reps", pose_manager.rep_count)
-        
-        if pose_manager.rep_count >= target_reps:
-            st.balloons()
-            st.success("🎉 Target reached! Great job!")
-            
-            if st.button("💾 Save Session"):
-                save_pose_session(exercise, target_reps)
-
-def render_pose_detection_area():
-    """Render the main pose detection area with camera feed"""
-    st.subheader("📹 Live Camera Feed")
-    
-    # Load the pose detection HTML component
-    pose_html = load_pose_detection_html()
-    
-    # Render the component
-    result = components.html(
-        pose_html,
-        height=600,
-        scrolling=True
-    )
-    
-    # Display current analysis if available
-    if 'current_pose_analysis' in st.session_state:
-        render_pose_analysis(st.session_state.current_pose_analysis)
-
-def load_pose_detection_html():
-    """Load the HTML component for pose detection"""
-    try:
-        with open('static/pose_detection.html', 'r') as f:
-            return f.read()
-    except FileNotFoundError:
-        # Return basic HTML if file not found
-        return create_basic_pose_html()
-
-def create_basic_pose_html():
-    """Create basic pose detection HTML"""
-    return """
+# Built-in pose detection page, used when static/pose_detection.html is missing
+_BASIC_POSE_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
-        <script src="https://cdn.jsdelivr.net/npm/@tensorflow/tfjs@3.15.0/dist/tf.min.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/@tensorflow-models/posenet@2.2.2/dist/posenet.min.js"></script>
+        <link rel="preconnect" href="https://cdn.jsdelivr.net">
+        <script defer src="https://cdn.jsdelivr.net/npm/@tensorflow/tfjs-core@4.15.0/dist/tf-core.min.js"></script>
+        <script defer src="https://cdn.jsdelivr.net/npm/@tensorflow/tfjs-backend-cpu@4.15.0/dist/tf-backend-cpu.min.js"></script>
+        <script defer src="https://cdn.jsdelivr.net/npm/@tensorflow/tfjs-tflite@0.0.1-alpha.10/dist/tf-tflite.min.js"></script>
         <style>
             body { margin: 0; padding: 20px; font-family: Arial, sans-serif; }
             #video-container { position: relative; display: flex; justify-content: center; }
@@ -154,17 +46,182 @@ def create_basic_pose_html():
             <div id="feedback-text">Position yourself in front of the camera and start exercising!</div>
         </div>
 
+        <script id="pose-core">
+            // Shared by the page and the inference worker
+            const MIN_POSE_SCORE = 0.3;
+            const TWO_PI = 2 * Math.PI;
+            
+            // Low-latency transparent overlay that is never read back
+            const OVERLAY_CONTEXT = { alpha: true, desynchronized: true, willReadFrequently: false };
+            
+            // Skeleton edges between COCO keypoints, filtered by score per frame
+            const SKELETON = [
+                [5, 7], [7, 9], [6, 8], [8, 10], [5, 6], [5, 11],
+                [6, 12], [11, 13], [13, 15], [12, 14], [14, 16], [11, 12]
+            ];
+            
+            // INT8-quantized MoveNet Lightning, run by the TFLite WebAssembly runtime
+            const MOVENET_INT8_URL = 'https://storage.googleapis.com/tfhub-lite-models/google/lite-model/movenet/singlepose/lightning/tflite/int8/4.tflite';
+            const TFLITE_WASM_PATH = 'https://cdn.jsdelivr.net/npm/@tensorflow/tfjs-tflite@0.0.1-alpha.10/wasm/';
+            const MOVENET_INPUT_SIZE = 192;
+            const NUM_KEYPOINTS = 17;
+            
+            // Keypoints are packed as [x0, y0, score0, x1, y1, score1, ...] in one reused buffer
+            const kpBuf = new Float32Array(NUM_KEYPOINTS * 3);
+            
+            async function createPoseDetector() {
+                // Only the small input resize runs in tfjs, so the CPU backend is enough
+                await tf.setBackend('cpu');
+                tflite.setWasmPath(TFLITE_WASM_PATH);
+                const model = await tflite.loadTFLiteModel(MOVENET_INT8_URL);
+                
+                // Poses come back as {score, keypoints: kpBuf}
+                return {
+                    async estimatePoses(image) {
+                        const width = image.videoWidth || image.width;
+                        const height = image.videoHeight || image.height;
+                        
+                        // MoveNet takes a 192x192 RGB frame with integer pixel values
+                        const output = tf.tidy(() => {
+                            const frame = tf.browser.fromPixels(image);
+                            const input = tf.image.resizeBilinear(frame, [MOVENET_INPUT_SIZE, MOVENET_INPUT_SIZE])
+                                .expandDims(0)
+                                .cast('int32');
+                            return model.predict(input);
+                        });
+                        
+                        // Output is [1, 1, 17, 3] rows of normalized (y, x, score)
+                        const data = await output.data();
+                        output.dispose();
+                        
+                        let total = 0;
+                        for (let o = 0; o < kpBuf.length; o += 3) {
+                            kpBuf[o] = data[o + 1] * width;
+                            kpBuf[o + 1] = data[o] * height;
+                            kpBuf[o + 2] = data[o + 2];
+                            total += data[o + 2];
+                        }
+                        return [{ score: total / NUM_KEYPOINTS, keypoints: kpBuf }];
+                    }
+                };
+            }
+            
+            // Keypoint indices in MoveNet's fixed COCO order
+            const KP = {
+                leftShoulder: 5, rightShoulder: 6,
+                leftElbow: 7, rightElbow: 8,
+                leftWrist: 9, rightWrist: 10
+            };
+            
+            // cos(160°)², so the 160° threshold can be tested on squared values
+            const COS_160_SQ = 0.8830;
+            
+            function classifyElbow(kp, a, b, c) {
+                // Compare the joint angle at b against 160° and 90° using the dot
+                // product of the two limb vectors instead of computing degrees
+                const v1x = kp[a] - kp[b], v1y = kp[a + 1] - kp[b + 1];
+                const v2x = kp[c] - kp[b], v2y = kp[c + 1] - kp[b + 1];
+                const dot = v1x * v2x + v1y * v2y;
+                const magSq = (v1x * v1x + v1y * v1y) * (v2x * v2x + v2y * v2y);
+                
+                // Above 160°: cosine is negative and cos² exceeds cos(160°)²
+                if (dot < 0 && dot * dot > COS_160_SQ * magSq) return 'up';
+                // Below 90°: cosine is positive
+                if (dot > 0) return 'down';
+                return 'middle';
+            }
+            
+            function renderAndAnalyze(ctx, pose) {
+                // Draw the overlay and classify the push-up elbow state from one
+                // read of the keypoint buffer; returns null when the arm isn't visible
+                ctx.clearRect(0, 0, ctx.canvas.width, ctx.canvas.height);
+                if (!pose) return null;
+                
+                const kp = pose.keypoints;
+                
+                // Skip drawing low-confidence poses
+                if (pose.score > MIN_POSE_SCORE) {
+                    const dots = new Path2D();
+                    const bones = new Path2D();
+                    
+                    for (let o = 0; o < kp.length; o += 3) {
+                        if (kp[o + 2] > 0.5) {
+                            dots.moveTo(kp[o] + 5, kp[o + 1]);
+                            dots.arc(kp[o], kp[o + 1], 5, 0, TWO_PI);
+                        }
+                    }
+                    
+                    for (const [i, j] of SKELETON) {
+                        const a = 3 * i;
+                        const b = 3 * j;
+                        if (kp[a + 2] > 0.5 && kp[b + 2] > 0.5) {
+                            bones.moveTo(kp[a], kp[a + 1]);
+                            bones.lineTo(kp[b], kp[b + 1]);
+                        }
+                    }
+                    
+                    // Set the drawing styles once per frame
+                    ctx.save();
+                    ctx.fillStyle = '#FF0000';
+                    ctx.strokeStyle = '#00FF00';
+                    ctx.lineWidth = 2;
+                    ctx.fill(dots);
+                    ctx.stroke(bones);
+                    ctx.restore();
+                }
+                
+                // Simple rep counting for push-ups
+                const shoulder = 3 * KP.leftShoulder;
+                const elbow = 3 * KP.leftElbow;
+                const wrist = 3 * KP.leftWrist;
+                
+                if (kp[shoulder + 2] > 0.5 && kp[elbow + 2] > 0.5 && kp[wrist + 2] > 0.5) {
+                    return classifyElbow(kp, shoulder, elbow, wrist);
+                }
+                return null;
+            }
+        </script>
+        
+        <script id="pose-worker" type="text/js-worker">
+            // Inference worker: draws on the transferred overlay and posts the elbow state back
+            let detector, ctx;
+            
+            self.onmessage = async (e) => {
+                const msg = e.data;
+                
+                if (msg.type === 'init') {
+                    ctx = msg.canvas.getContext('2d', OVERLAY_CONTEXT);
+                    detector = await createPoseDetector();
+                    self.postMessage({ type: 'ready' });
+                } else if (msg.type === 'frame') {
+                    let pose = null;
+                    try {
+                        const poses = await detector.estimatePoses(msg.bitmap);
+                        pose = poses[0] || null;
+                    } catch (err) {
+                        console.error('Detection error:', err);
+                    } finally {
+                        msg.bitmap.close();
+                    }
+                    
+                    const state = renderAndAnalyze(ctx, pose);
+                    self.postMessage({ type: 'pose', state: state });
+                }
+            };
+        </script>
+
         <script>
-            let video, canvas, ctx, net;
+            let video, canvas, ctx, detector, worker;
             let isDetecting = false;
             let repCount = 0;
             let lastPoseState = null;
             
+            // Cap detection at ~30 fps
+            const TARGET_MS = 33;
+            let lastT = 0;
+            let frameInFlight = false;
+            
             async function setupCamera() {
-                video = document.getElementById('video');
-                canvas = document.getElementById('canvas');
-                ctx = canvas.getContext('2d');
-                
                 const stream = await navigator.mediaDevices.getUserMedia({ 
                     video: { width: 640, height: 480 } 
                 });
@@ -177,26 +234,68 @@ def create_basic_pose_html():
                 });
             }
             
-            async function loadPoseNet() {
-                updateStatus('Loading PoseNet model...');
-                net = await posenet.load({
-                    architecture: 'MobileNetV1',
-                    outputStride: 16,
-                    inputResolution: { width: 640, height: 480 },
-                    multiplier: 0.75
+            function startWorker() {
+                // Build the worker from the page's model scripts, the shared core
+                // and the worker handler so no extra file has to be served
+                const urls = Array.from(document.querySelectorAll('script[src]'), s => JSON.stringify(s.src));
+                const source = 'importScripts(' + urls.join(', ') + ');' +
+                    document.getElementById('pose-core').textContent +
+                    document.getElementById('pose-worker').textContent;
+                worker = new Worker(URL.createObjectURL(new Blob([source], { type: 'text/javascript' })));
+                
+                // Hand the overlay to the worker so it draws off the main thread
+                const offscreen = canvas.transferControlToOffscreen();
+                
+                return new Promise((resolve, reject) => {
+                    worker.onmessage = (e) => {
+                        if (e.data.type === 'ready') {
+                            worker.onmessage = onWorkerMessage;
+                            resolve();
+                        }
+                    };
+                    worker.onerror = (e) => reject(new Error(e.message));
+                    worker.postMessage({ type: 'init', canvas: offscreen }, [offscreen]);
                 });
-                updateStatus('PoseNet model loaded successfully!');
+            }
+            
+            function onWorkerMessage(e) {
+                frameInFlight = false;
+                if (e.data.state) {
+                    updateState(e.data.state);
+                }
+            }
+            
+            async function loadPoseModel() {
+                if (worker || detector) return;
+                
+                updateStatus('Loading MoveNet model...');
+                
+                // Size the overlay before it can be transferred to the worker
+                canvas.width = 640;
+                canvas.height = 480;
+                
+                if (typeof OffscreenCanvas !== 'undefined' && canvas.transferControlToOffscreen) {
+                    await startWorker();
+                } else {
+                    // Fall back to inference on the main thread
+                    ctx = canvas.getContext('2d', OVERLAY_CONTEXT);
+                    detector = await createPoseDetector();
+                }
+                updateStatus('MoveNet model loaded successfully!');
             }
             
             async function startCamera() {
                 try {
+                    video = document.getElementById('video');
+                    canvas = document.getElementById('canvas');
+                    
+                    // Open the camera while the model loads
                     updateStatus('Setting up camera...');
-                    await setupCamera();
-                    await loadPoseNet();
+                    await Promise.all([setupCamera(), loadPoseModel()]);
                     
                     isDetecting = true;
                     updateStatus('Pose detection active');
-                    detectPoses();
+                    scheduleDetection();
                 } catch (err) {
                     updateStatus('Error: ' + err.message);
                     console.error(err);
@@ -212,93 +311,76 @@ def create_basic_pose_html():
                 }
             }
             
-            async function detectPoses() {
+            function scheduleDetection() {
+                // Run once per new camera frame where supported, otherwise per display frame
+                if (video.requestVideoFrameCallback) {
+                    video.requestVideoFrameCallback(detectPoses);
+                } else {
+                    requestAnimationFrame(detectPoses);
+                }
+            }
+            
+            async function detectPoses(now) {
                 if (!isDetecting) return;
                 
+                // Wait for the next frame until the budget has elapsed
+                if (now - lastT < TARGET_MS) {
+                    scheduleDetection();
+                    return;
+                }
+                lastT = now;
+                
                 try {
-                    const pose = await net.estimateSinglePose(video, {
-                        flipHorizontal: false
-                    });
-                    
-                    drawPose(pose);
-                    analyzePose(pose);
-                    
+                    if (worker) {
+                        // Transfer the frame to the worker, one frame in flight at a time
+                        if (!frameInFlight) {
+                            const bitmap = await createImageBitmap(video);
+                            frameInFlight = true;
+                            worker.postMessage({ type: 'frame', bitmap: bitmap }, [bitmap]);
+                        }
+                    } else {
+                        const poses = await detector.estimatePoses(video);
+                        const pose = poses[0];
+                        
+                        const state = renderAndAnalyze(ctx, pose);
+                        if (state) {
+                            updateState(state);
+                        }
+                    }
                 } catch (err) {
                     console.error('Detection error:', err);
                 }
                 
-                requestAnimationFrame(detectPoses);
-            }
-            
-            function drawPose(pose) {
-                ctx.clearRect(0, 0, canvas.width, canvas.height);
-                
-                // Draw keypoints
-                pose.keypoints.forEach(keypoint => {
-                    if (keypoint.score > 0.5) {
-                        ctx.beginPath();
-                        ctx.arc(keypoint.position.x, keypoint.position.y, 5, 0, 2 * Math.PI);
-                        ctx.fillStyle = '#FF0000';
-                        ctx.fill();
-                    }
-                });
-                
-                // Draw skeleton
-                const adjacentKeyPoints = posenet.getAdjacentKeyPoints(pose.keypoints, 0.5);
-                adjacentKeyPoints.forEach(keypoints => {
-                    ctx.beginPath();
-                    ctx.moveTo(keypoints[0].position.x, keypoints[0].position.y);
-                    ctx.lineTo(keypoints[1].position.x, keypoints[1].position.y);
-                    ctx.strokeStyle = '#00FF00';
-                    ctx.lineWidth = 2;
-                    ctx.stroke();
-                });
+                scheduleDetection();
             }
             
-            function analyzePose(pose) {
-                // Simple rep counting for push-ups
-                const leftShoulder = pose.keypoints.find(kp => kp.part === 'leftShoulder');
-                const leftElbow = pose.keypoints.find(kp => kp.part === 'leftElbow');
-                const leftWrist = pose.keypoints.find(kp => kp.part === 'leftWrist');
-                
-                if (leftShoulder && leftElbow && leftWrist && 
-                    leftShoulder.score > 0.5 && leftElbow.score > 0.5 && leftWrist.score > 0.5) {
-                    
-                    const angle = calculateAngle(
-                        leftShoulder.position, 
-                        leftElbow.position, 
-                        leftWrist.position
-                    );
-                    
-                    const currentState = angle > 160 ? 'up' : angle < 90 ? 'down' : 'middle';
-                    
-                    if (lastPoseState === 'down' && currentState === 'up') {
-                        repCount++;
-                        updateFeedback(`Great! Rep ${repCount} completed. Keep going!`);
-                    } else if (currentState === 'down') {
-                        updateFeedback('Good depth! Push back up.');
-                    } else if (currentState === 'up') {
-                        updateFeedback('Ready for next rep. Lower down slowly.');
-                    }
-                    
-                    lastPoseState = currentState;
+            function updateState(currentState) {
+                // Count a rep on each down -> up transition
+                if (lastPoseState === 'down' && currentState === 'up') {
+                    repCount++;
+                    updateFeedback(`Great! Rep ${repCount} completed. Keep going!`);
+                } else if (currentState === 'down') {
+                    updateFeedback('Good depth! Push back up.');
+                } else if (currentState === 'up') {
+                    updateFeedback('Ready for next rep. Lower down slowly.');
                 }
+                
+                lastPoseState = currentState;
             }
             
-            function calculateAngle(a, b, c) {
-                const radians = Math.atan2(c.y - b.y, c.x - b.x) - Math.atan2(a.y - b.y, a.x - b.x);
-                let angle = Math.abs(radians * 180.0 / Math.PI);
-                if (angle > 180.0) {
-                    angle = 360 - angle;
-                }
-                return angle;
-            }
+            // Last text written to each panel, so repeated messages skip the DOM
+            let lastStatus = '';
+            let lastFeedback = '';
             
             function updateStatus(message) {
+                if (message === lastStatus) return;
+                lastStatus = message;
                 document.getElementById('status-text').textContent = message;
             }
             
             function updateFeedback(message) {
+                if (message === lastFeedback) return;
+                lastFeedback = message;
                 document.getElementById('feedback-text').textContent = message;
             }
             
@@ -311,6 +393,132 @@ def create_basic_pose_html():
     </html>
     """
 
+def render_pose_detector():
+    """Render pose detection interface"""
+    st.title("📹 AI Pose Detection")
+    
+    # Check camera permissions info
+    st.info("🔒 This feature requires camera access. Please allow camera permissions when prompted.")
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        render_pose_controls()
+    
+    with col2:
+        render_pose_detection_area()
+
+@st.fragment
+def render_pose_controls():
+    """Render pose detection controls (reruns on its own so the camera iframe stays mounted)"""
+    st.subheader("🎯 Exercise Selection")
+    
+    # Exercise selection
+    exercise = st.selectbox(
+        "Choose Exercise to Practice",
+        [
+            "Push-ups",
+            "Squats", 
+            "Plank",
+            "Lunges",
+            "Burpees",
+            "Jumping Jacks"
+        ]
+    )
+    
+    # Detection settings
+    st.subheader("⚙️ Detection Settings")
+    
+    confidence_threshold = st.slider(
+        "Confidence Threshold",
+        min_value=0.1,
+        max_value=1.0,
+        value=0.5,
+        step=0.1,
+        help="Higher values require more confident pose detection"
+    )
+    
+    show_keypoints = st.checkbox("Show Keypoints", value=True)
+    show_skeleton = st.checkbox("Show Skeleton", value=True)
+    
+    # Rep counting settings
+    st.subheader("📊 Rep Counting")
+    
+    target_reps = st.number_input(
+        "Target Reps",
+        min_value=1,
+        max_value=100,
+        value=10
+    )
+    
+    # Control buttons
+    st.subheader("🎮 Controls")
+    
+    col_a, col_b = st.columns(2)
+    
+    with col_a:
+        if st.button("▶️ Start Detection", type="primary"):
+            start_pose_detection(exercise, confidence_threshold, target_reps)
+    
+    with col_b:
+        if st.button("⏹️ Stop Detection"):
+            stop_pose_detection()
+    
+    # Current session info
+    if pose_manager.is_detecting:
+        st.success(f"🟢 Detecting: {pose_manager.current_exercise}")
+        st.metric("Current Reps", pose_manager.rep_count)
+        
+        if pose_manager.rep_count >= target_reps:
+            # Celebrate once per session rather than on every rerun
+            if not st.session_state.get('celebrated'):
+                st.balloons()
+                st.session_state.celebrated = True
+            st.success("🎉 Target reached! Great job!")
+            
+            if st.button("💾 Save Session"):
+                save_pose_session(exercise, target_reps)
+
+def render_pose_detection_area():
+    """Render the main pose detection area with camera feed"""
+    st.subheader("📹 Live Camera Feed")
+    
+    # Load the pose detection HTML component
+    pose_html = load_pose_detection_html()
+    
+    # Render the component; the pose controls fragment reruns without touching
+    # it, but components.html takes no key, so on full app reruns the iframe
+    # (and the pose model loaded inside it) is only kept mounted while its
+    # position and arguments stay the same. Keep conditional elements below it
+    result = components.html(
+        pose_html,
+        height=600,
+        scrolling=True
+    )
+    
+    # Display current analysis if available
+    if 'current_pose_analysis' in st.session_state:
+        render_pose_analysis(st.session_state.current_pose_analysis)
+
+@st.cache_data(show_spinner=False)
+def _read_html(path, mtime):
+    """Read an HTML file; mtime is part of the cache key so edits are picked up"""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+def load_pose_detection_html():
+    """Load the HTML component for pose detection"""
+    path = 'static/pose_detection.html'
+    try:
+        return _read_html(path, os.path.getmtime(path))
+    except FileNotFoundError:
+        # Return basic HTML if file not found
+        return _BASIC_POSE_HTML
+
+def create_basic_pose_html():
+    """Create basic pose detection HTML"""
+    return _BASIC_POSE_HTML
+
 def render_pose_analysis(analysis):
     """Render pose analysis results"""
     if not analysis:
@@ -343,11 +551,12 @@ def start_pose_detection(exercise, confidence_threshold, target_reps):
     """Start pose detection session"""
     pose_manager.start_detection(exercise)
     pose_manager.confidence_threshold = confidence_threshold
+    st.session_state.celebrated = False
     
     st.session_state.pose_session = {
         'exercise': exercise,
         'target_reps': target_reps,
-        'start_time': datetime.now(),
+        'start_time': time.monotonic(),
         'active': True
     }
     
@@ -366,7 +575,7 @@ def save_pose_session(exercise, target_reps):
     """Save completed pose detection session"""
     if 'pose_session' in st.session_state:
         session = st.session_state.pose_session
-        duration = (datetime.now() - session['start_time']).total_seconds()
+        duration = time.monotonic() - session['start_time']
         
         success = pose_manager.save_workout_session(
             exercise, 
@@ -390,6 +599,7 @@ def save_pose_session(exercise, target_reps):
             
             # Reset for next session
             pose_manager.rep_count = 0
+            st.session_state.celebrated = False
             del st.session_state.pose_session
         else:
             st.error("❌ Failed to save session")
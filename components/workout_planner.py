@@ -1,10 +1,69 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from models.lstm_recommender import LSTMRecommender
+from types import MappingProxyType
 from utils.youtube_api import youtube_api
-from utils.data_loader import calculate_workout_calories
+from utils.data_loader import calculate_workout_calories, append_workout_history, recent_workouts
+from utils.model_loader import get_lstm_recommender
 import random
+import zlib
+
+# Basic exercise library for the fallback generator
+_EXERCISE_LIBRARY = MappingProxyType({
+    "Chest": (
+        {"exercise": "Push-ups", "equipment": "None"},
+        {"exercise": "Incline Push-ups", "equipment": "None"},
+        {"exercise": "Chest Press", "equipment": "Dumbbells"}
+    ),
+    "Legs": (
+        {"exercise": "Squats", "equipment": "None"},
+        {"exercise": "Lunges", "equipment": "None"},
+        {"exercise": "Jump Squats", "equipment": "None"}
+    ),
+    "Core": (
+        {"exercise": "Plank", "equipment": "None"},
+        {"exercise": "Sit-ups", "equipment": "None"},
+        {"exercise": "Russian Twists", "equipment": "None"}
+    ),
+    "Back": (
+        {"exercise": "Pull-ups", "equipment": "Pull-up Bar"},
+        {"exercise": "Superman", "equipment": "None"},
+        {"exercise": "Bent-over Rows", "equipment": "Dumbbells"}
+    ),
+    "Arms": (
+        {"exercise": "Tricep Dips", "equipment": "None"},
+        {"exercise": "Bicep Curls", "equipment": "Dumbbells"},
+        {"exercise": "Pike Push-ups", "equipment": "None"}
+    ),
+    "Cardio": (
+        {"exercise": "Jumping Jacks", "equipment": "None"},
+        {"exercise": "Burpees", "equipment": "None"},
+        {"exercise": "High Knees", "equipment": "None"}
+    )
+})
+
+# Workout focus to recommender goal
+_WORKOUT_GOAL_MAP = MappingProxyType({
+    "Strength Training": "muscle_gain",
+    "Cardio": "weight_loss",
+    "HIIT": "weight_loss",
+    "Flexibility": "endurance",
+    "Full Body": "general_fitness",
+    "AI Recommended": "general_fitness"
+})
+
+# Fallback exercise names bucketed by muscle group, then by required equipment
+_EXERCISE_BUCKETS = MappingProxyType({
+    group: MappingProxyType({
+        equip: tuple(ex["exercise"] for ex in exercises if ex["equipment"] == equip)
+        for equip in dict.fromkeys(ex["equipment"] for ex in exercises)
+    })
+    for group, exercises in _EXERCISE_LIBRARY.items()
+})
+
+def _now_iso():
+    """Get the current local time as an ISO 8601 string"""
+    return datetime.now().isoformat()
 
 def render_workout_planner():
     """Render workout planning interface"""
@@ -30,47 +89,52 @@ def render_workout_preferences():
     """Render workout preference settings"""
     st.subheader("🎯 Workout Preferences")
     
-    # Workout type selection
-    workout_type = st.selectbox(
-        "Workout Focus",
-        ["AI Recommended", "Strength Training", "Cardio", "HIIT", "Flexibility", "Full Body"],
-        index=0
-    )
-    
-    # Duration
-    duration = st.slider(
-        "Workout Duration (minutes)",
-        min_value=15,
-        max_value=90,
-        value=st.session_state.user_profile.get('workout_duration', 45),
-        step=5
-    )
-    
-    # Intensity
-    intensity = st.selectbox(
-        "Intensity Level",
-        ["Beginner", "Intermediate", "Advanced"],
-        index=["Beginner", "Intermediate", "Advanced"].index(
-            st.session_state.user_profile.get('experience', 'Beginner')
+    # Preferences are batched in a form so dragging the slider or editing
+    # a multiselect doesn't rerun the app
+    with st.form("workout_prefs"):
+        # Workout type selection
+        workout_type = st.selectbox(
+            "Workout Focus",
+            ["AI Recommended", "Strength Training", "Cardio", "HIIT", "Flexibility", "Full Body"],
+            index=0
         )
-    )
-    
-    # Equipment available
-    equipment = st.multiselect(
-        "Available Equipment",
-        ["None (Bodyweight)", "Dumbbells", "Barbell", "Resistance Bands", "Pull-up Bar", "Kettlebell", "Machine"],
-        default=["None (Bodyweight)"]
-    )
-    
-    # Target muscle groups
-    muscle_groups = st.multiselect(
-        "Target Muscle Groups",
-        ["Chest", "Back", "Shoulders", "Arms", "Legs", "Core", "Glutes", "Cardio"],
-        default=["Full Body"]
-    )
+        
+        # Duration
+        duration = st.slider(
+            "Workout Duration (minutes)",
+            min_value=15,
+            max_value=90,
+            value=st.session_state.user_profile.get('workout_duration', 45),
+            step=5
+        )
+        
+        # Intensity
+        intensity = st.selectbox(
+            "Intensity Level",
+            ["Beginner", "Intermediate", "Advanced"],
+            index=["Beginner", "Intermediate", "Advanced"].index(
+                st.session_state.user_profile.get('experience', 'Beginner')
+            )
+        )
+        
+        # Equipment available
+        equipment = st.multiselect(
+            "Available Equipment",
+            ["None (Bodyweight)", "Dumbbells", "Barbell", "Resistance Bands", "Pull-up Bar", "Kettlebell", "Machine"],
+            default=["None (Bodyweight)"]
+        )
+        
+        # Target muscle groups
+        muscle_groups = st.multiselect(
+            "Target Muscle Groups",
+            ["Chest", "Back", "Shoulders", "Arms", "Legs", "Core", "Glutes", "Cardio"],
+            default=["Full Body"]
+        )
+        
+        # Generate workout button
+        submitted = st.form_submit_button("🔥 Generate AI Workout", type="primary")
     
-    # Generate workout button
-    if st.button("🔥 Generate AI Workout", type="primary"):
+    if submitted:
         generate_workout(workout_type, duration, intensity, equipment, muscle_groups)
 
 def generate_workout(workout_type, duration, intensity, equipment, muscle_groups):
@@ -87,16 +151,26 @@ def generate_workout(workout_type, duration, intensity, equipment, muscle_groups
             
             # Use LSTM recommender if available
             if st.session_state.models_loaded:
-                recommender = st.session_state.lstm_recommender
+                recommender = get_lstm_recommender()
                 
-                # Prepare user profile for recommendation
-                user_profile = st.session_state.user_profile.copy()
-                user_profile['goal'] = map_workout_type_to_goal(workout_type)
+                # Pass the goal alongside the profile instead of copying it
+                user_profile = st.session_state.user_profile
+                goal = map_workout_type_to_goal(workout_type)
+                
+                # The predicted complexity only depends on the model features,
+                # so reuse this session's last prediction while they are unchanged
+                features_key = (goal,) + tuple(user_profile.get(k) for k in ('body_type', 'experience', 'bmi', 'age'))
+                cached = st.session_state.get('_workout_complexity')
+                if cached is None or cached['key'] != features_key:
+                    cached = {'key': features_key, 'complexity': recommender.predict_complexity(user_profile, goal)}
+                    st.session_state._workout_complexity = cached
                 
                 # Get workout recommendation
                 workout_exercises = recommender.recommend_workout(
                     user_profile, 
-                    st.session_state.workout_history[-7:] if st.session_state.workout_history else None
+                    recent_workouts(7) or None,
+                    complexity=cached['complexity'],
+                    goal=goal
                 )
                 
                 # Create complete workout plan
@@ -104,11 +178,11 @@ def generate_workout(workout_type, duration, intensity, equipment, muscle_groups
                     'type': workout_type,
                     'duration': duration,
                     'intensity': intensity,
-                    'goal': user_profile['goal'],
+                    'goal': goal,
                     'focus': ', '.join(muscle_groups) if muscle_groups else 'Full Body',
                     'exercises': workout_exercises,
                     'estimated_calories': calculate_workout_calories(workout_exercises, duration),
-                    'generated_at': datetime.now().isoformat()
+                    'generated_at': _now_iso()
                 }
                 
             else:
@@ -117,16 +191,16 @@ def generate_workout(workout_type, duration, intensity, equipment, muscle_groups
             
             # Store in session state
             st.session_state.current_workout = workout_plan
-            
+        
+        # The workout display renders after the preferences column in this
+        # same run, so it already picks up the new plan without a rerun
         st.success("✅ Workout generated successfully!")
-        st.rerun()
         
     except Exception as e:
         st.error(f"Error generating workout: {str(e)}")
         # Generate fallback workout
         workout_plan = generate_fallback_workout(workout_type, duration, intensity, equipment, muscle_groups)
         st.session_state.current_workout = workout_plan
-        st.rerun()
 
 def render_workout_display():
     """Display current workout plan"""
@@ -158,24 +232,33 @@ def render_workout_display():
     # Exercise list
     st.subheader("📋 Exercise Plan")
     
-    for i, exercise in enumerate(workout['exercises'], 1):
-        with st.expander(f"Exercise {i}: {exercise['exercise']}", expanded=True):
-            col_x, col_y, col_z = st.columns([2, 1, 1])
-            
-            with col_x:
-                st.write(f"**Sets:** {exercise['sets']}")
-                st.write(f"**Reps:** {exercise['reps']}")
-                st.write(f"**Rest:** {exercise['rest']}")
-            
-            with col_y:
-                # YouTube video button
-                if st.button(f"📹 Watch Demo", key=f"video_{i}"):
-                    show_exercise_video(exercise['exercise'])
-            
-            with col_z:
-                # Mark exercise complete
-                if st.button(f"✅ Complete", key=f"complete_{i}"):
-                    mark_exercise_complete(i-1)
+    # One table and one set of actions for the chosen exercise, rather than
+    # an expander with its own pair of buttons per exercise
+    exercises = workout['exercises']
+    plan_df = pd.DataFrame(exercises, columns=['exercise', 'sets', 'reps', 'rest']).astype(str)
+    plan_df.columns = ['Exercise', 'Sets', 'Reps', 'Rest']
+    plan_df.index = range(1, len(plan_df) + 1)
+    st.dataframe(plan_df, use_container_width=True)
+    
+    selected = st.selectbox(
+        "Exercise",
+        range(len(exercises)),
+        format_func=lambda i: f"{i + 1}. {exercises[i]['exercise']}"
+    )
+    
+    col_y, col_z = st.columns(2)
+    
+    with col_y:
+        # YouTube video button
+        watch_demo = st.button("📹 Watch Demo", key="video_demo")
+    
+    with col_z:
+        # Mark exercise complete
+        if st.button("✅ Complete", key="complete_exercise"):
+            mark_exercise_complete(selected)
+    
+    if watch_demo:
+        show_exercise_video(exercises[selected]['exercise'])
     
     # Workout actions
     st.subheader("🚀 Workout Actions")
@@ -198,6 +281,8 @@ def render_workout_display():
 def show_exercise_video(exercise_name):
     """Show YouTube video for exercise"""
     with st.spinner("🔍 Finding instructional videos..."):
+        # youtube_api caches successful API results itself, and never caches
+        # the fallback videos returned after an error
         videos = youtube_api.search_workout_videos(exercise_name, max_results=3)
         
         if videos:
@@ -235,7 +320,6 @@ def start_workout_session():
             'completed_exercises': []
         }
         st.success("🏃 Workout session started! Timer is running.")
-        st.rerun()
 
 def mark_exercise_complete(exercise_index):
     """Mark a specific exercise as complete"""
@@ -260,18 +344,25 @@ def mark_exercise_complete(exercise_index):
 def complete_workout():
     """Mark entire workout as complete"""
     if st.session_state.current_workout:
-        workout_data = st.session_state.current_workout.copy()
-        workout_data['date'] = datetime.now().isoformat()
+        # Take one timestamp for both the history date and the session duration
+        now = datetime.now()
+        
+        # Annotate in place; current_workout is cleared below
+        workout_data = st.session_state.current_workout
+        workout_data['date'] = now.isoformat()
         workout_data['completed'] = True
+        workout_data['calories'] = calculate_workout_calories(
+            workout_data.get('exercises', []), workout_data.get('duration', 30)
+        )
         
         # Calculate actual duration if session was started
         if 'workout_session' in st.session_state and st.session_state.workout_session.get('started'):
             start_time = st.session_state.workout_session['start_time']
-            actual_duration = (datetime.now() - start_time).total_seconds() / 60
+            actual_duration = (now - start_time).total_seconds() / 60
             workout_data['actual_duration'] = actual_duration
         
         # Add to history
-        st.session_state.workout_history.append(workout_data)
+        append_workout_history(workout_data)
         
         # Clear current workout and session
         st.session_state.current_workout = None
@@ -307,67 +398,40 @@ def render_sample_workout():
 
 def map_workout_type_to_goal(workout_type):
     """Map workout type to fitness goal for LSTM model"""
-    mapping = {
-        "Strength Training": "muscle_gain",
-        "Cardio": "weight_loss", 
-        "HIIT": "weight_loss",
-        "Flexibility": "endurance",
-        "Full Body": "general_fitness",
-        "AI Recommended": "general_fitness"
-    }
-    return mapping.get(workout_type, "general_fitness")
+    return _WORKOUT_GOAL_MAP.get(workout_type, "general_fitness")
 
 def generate_fallback_workout(workout_type, duration, intensity, equipment, muscle_groups):
     """Generate fallback workout when AI model is not available"""
-    # Basic exercise library
-    exercise_library = {
-        "Chest": [
-            {"exercise": "Push-ups", "equipment": "None"},
-            {"exercise": "Incline Push-ups", "equipment": "None"},
-            {"exercise": "Chest Press", "equipment": "Dumbbells"}
-        ],
-        "Legs": [
-            {"exercise": "Squats", "equipment": "None"},
-            {"exercise": "Lunges", "equipment": "None"},
-            {"exercise": "Jump Squats", "equipment": "None"}
-        ],
-        "Core": [
-            {"exercise": "Plank", "equipment": "None"},
-            {"exercise": "Sit-ups", "equipment": "None"},
-            {"exercise": "Russian Twists", "equipment": "None"}
-        ],
-        "Back": [
-            {"exercise": "Pull-ups", "equipment": "Pull-up Bar"},
-            {"exercise": "Superman", "equipment": "None"},
-            {"exercise": "Bent-over Rows", "equipment": "Dumbbells"}
-        ],
-        "Arms": [
-            {"exercise": "Tricep Dips", "equipment": "None"},
-            {"exercise": "Bicep Curls", "equipment": "Dumbbells"},
-            {"exercise": "Pike Push-ups", "equipment": "None"}
-        ],
-        "Cardio": [
-            {"exercise": "Jumping Jacks", "equipment": "None"},
-            {"exercise": "Burpees", "equipment": "None"},
-            {"exercise": "High Knees", "equipment": "None"}
-        ]
-    }
+    # Count this session's generations so each press draws a new plan
+    variant = st.session_state.get('fallback_variant', 0) + 1
+    st.session_state.fallback_variant = variant
+    
+    # Equipment order doesn't matter but muscle group order sets the exercise order
+    workout_plan = _cached_fallback_workout(
+        workout_type, duration, intensity, tuple(sorted(equipment)), tuple(muscle_groups), variant
+    )
+    workout_plan['generated_at'] = _now_iso()
+    return workout_plan
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def _cached_fallback_workout(workout_type, duration, intensity, equipment, muscle_groups, variant):
+    """Build a variant of the fallback plan for a set of preferences"""
+    # Seed the shuffle from the preferences and variant so a variant is the
+    # same plan whichever session computes it first, while regenerating
+    # moves on to the next variant
+    seed = zlib.crc32(repr((workout_type, duration, intensity, equipment, muscle_groups, variant)).encode())
     
     # Select exercises based on muscle groups and equipment
-    selected_exercises = []
     target_groups = muscle_groups if muscle_groups else ["Chest", "Legs", "Core", "Cardio"]
+    available = set(equipment) | {"None"}
+    rng = random.Random(seed)
     
+    # Up to two distinct exercises per group from the usable equipment buckets
+    selected_exercises = []
     for group in target_groups:
-        if group in exercise_library:
-            available_exercises = [
-                ex for ex in exercise_library[group] 
-                if ex["equipment"] in equipment or ex["equipment"] == "None"
-            ]
-            if available_exercises:
-                selected_exercises.extend(random.sample(
-                    available_exercises, 
-                    min(2, len(available_exercises))
-                ))
+        buckets = _EXERCISE_BUCKETS.get(group, {})
+        pool = [ex for equip, names in buckets.items() if equip in available for ex in names]
+        selected_exercises.extend(rng.sample(pool, min(2, len(pool))))
     
     # Create workout plan
     workout_exercises = []
@@ -381,7 +445,7 @@ def generate_fallback_workout(workout_type, duration, intensity, equipment, musc
             sets, reps = 4, 15
         
         workout_exercises.append({
-            "exercise": exercise["exercise"],
+            "exercise": exercise,
             "sets": sets,
             "reps": reps,
             "rest": "30-60 seconds"
@@ -404,6 +468,5 @@ def generate_fallback_workout(workout_type, duration, intensity, equipment, musc
         'goal': map_workout_type_to_goal(workout_type),
         'focus': ', '.join(muscle_groups) if muscle_groups else 'Full Body',
         'exercises': workout_exercises,
-        'estimated_calories': calculate_workout_calories(workout_exercises, duration),
-        'generated_at': datetime.now().isoformat()
+        'estimated_calories': calculate_workout_calories(workout_exercises, duration)
     }
@@ -1,330 +1,343 @@
 """
-Generate animated exercise form GIFs using matplotlib and imageio
+Generate animated exercise form GIFs by drawing stick-figure frames with Pillow
 """
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-import numpy as np
-from matplotlib.patches import Circle, Rectangle
+from functools import lru_cache
+import math
 import io
 import base64
+import os
+import streamlit as st
 
-def create_pushup_gif():
-    """Create animated pushup form GIF"""
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 6)
-    ax.set_facecolor('#262730')
-    fig.patch.set_facecolor('#262730')
-    ax.axis('off')
+# Pillow is imported inside the drawing helpers so serving built GIFs
+# never loads it
+
+# Built GIFs are cached in a writable per-user directory rather than next to
+# the code; set EXERCISE_GIF_DIR to use another one, and run this module to
+# (re)build them ahead of time
+GIF_DIR = os.environ.get(
+    'EXERCISE_GIF_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'ai-fitness-coach', 'gifs')
+)
+
+# Frame size in pixels; plot units span 0-10 across and 0-y_max up
+_WIDTH, _HEIGHT = 640, 480
+
+# Colours, pre-blended against the background where the old plots used alpha
+_BG = '#262730'
+_FIGURE = '#596dc5'
+_GROUND = '#3f3f43'
+_GUIDE = '#3a805b'
+_TITLE = '#FAFAFA'
+_TEXT = '#d0d0d2'
+_GOOD = '#48bb78'
+_ACCENT = '#667eea'
+
+# Line widths and font sizes in pixels
+_TORSO_WIDTH = 9
+_LIMB_WIDTH = 7
+_GROUND_WIDTH = 2
+_TITLE_SIZE = 18
+_TIMER_SIZE = 16
+_BODY_SIZE = 13
+_HINT_SIZE = 11
+
+# Frames in one plank breathing cycle (sin(frame / 30 * 4 pi))
+_PLANK_PERIOD = 15
+
+# Palette size per frame; a handful of flat colours plus text antialiasing
+_PALETTE_COLORS = 16
+
+def _new_frame(y_max, background=None):
+    """Create a frame, blank or copied from a background, and a mapping from plot units to pixels"""
+    from PIL import Image, ImageDraw
+    
+    img = background.copy() if background is not None else Image.new('RGB', (_WIDTH, _HEIGHT), _BG)
+    sx = _WIDTH / 10.0
+    sy = _HEIGHT / y_max
+    
+    def to_px(x, y):
+        return (float(x) * sx, _HEIGHT - float(y) * sy)
+    
+    return img, ImageDraw.Draw(img), to_px
+
+def _limb(draw, to_px, xs, ys, width=_LIMB_WIDTH, fill=_FIGURE):
+    """Draw a line segment given in plot units"""
+    draw.line([to_px(xs[0], ys[0]), to_px(xs[1], ys[1])], fill=fill, width=width)
+
+def _head(draw, to_px, center):
+    """Draw the stick figure's head given in plot units"""
+    left, top = to_px(center[0] - 0.3, center[1] + 0.3)
+    right, bottom = to_px(center[0] + 0.3, center[1] - 0.3)
+    draw.ellipse([left, top, right, bottom], fill=_FIGURE)
+
+def _label(draw, to_px, x, y, text, size, fill=_TEXT):
+    """Draw text centred on a point given in plot units"""
+    draw.text(to_px(x, y), text, fill=fill, font=_font(size), anchor='mm')
+
+@lru_cache(maxsize=None)
+def _font(size):
+    """Load Pillow's default font at a pixel size"""
+    from PIL import ImageFont
+    return ImageFont.load_default(size=size)
+
+def _background(y_max, ground_y, title, title_y, instructions, instructions_y):
+    """Draw the parts of a frame that never change: ground, title and instructions"""
+    img, draw, to_px = _new_frame(y_max)
+    _limb(draw, to_px, [0, 10], [ground_y, ground_y], width=_GROUND_WIDTH, fill=_GROUND)
+    _label(draw, to_px, 5, title_y, title, _TITLE_SIZE, fill=_TITLE)
+    _label(draw, to_px, 5, instructions_y, instructions, _BODY_SIZE)
+    return img
+
+def _encode_gif(frames):
+    """Encode frames as a looping 10 fps GIF"""
+    from PIL import Image
     
-    # Body parts
-    head = Circle((2, 4), 0.3, color='#667eea', alpha=0.8)
+    # Quantize each frame to a small palette up front so the GIF writer
+    # doesn't run its own full 256-colour quantization
+    frames = [frame.convert('P', palette=Image.Palette.ADAPTIVE, colors=_PALETTE_COLORS) for frame in frames]
     
-    def animate(frame):
-        ax.clear()
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 6)
-        ax.set_facecolor('#262730')
-        ax.axis('off')
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format='GIF', save_all=True, append_images=frames[1:],
+                   duration=100, loop=0, optimize=True)
+    return buffer.getvalue()
+
+def _render_pushup_gif():
+    """Render animated pushup form GIF bytes"""
+    # Ground, title and instructions are drawn once and copied per frame
+    background = _background(6, 1.5, 'PUSH-UP FORM', 5.5, 'Lower chest to ground, push back up', 0.8)
+    frames = []
+    
+    for frame in range(40):
+        img, draw, to_px = _new_frame(6, background)
         
         # Animation cycle
         t = frame / 20.0
-        y_offset = 0.5 * np.sin(t * 2 * np.pi)
+        y_offset = 0.5 * math.sin(t * 2 * math.pi)
         
         # Head
-        head_pos = (2, 3.5 + y_offset)
-        ax.add_patch(Circle(head_pos, 0.3, color='#667eea', alpha=0.8))
+        _head(draw, to_px, (2, 3.5 + y_offset))
         
         # Body (torso)
-        body_start = (2, 3.5 + y_offset)
-        body_end = (8, 3.5 + y_offset)
-        ax.plot([body_start[0], body_end[0]], [body_start[1], body_end[1]], 
-                color='#667eea', linewidth=8, alpha=0.8)
+        _limb(draw, to_px, [2, 8], [3.5 + y_offset, 3.5 + y_offset], width=_TORSO_WIDTH)
         
         # Arms
         arm_y = 3.5 + y_offset
-        # Left arm
-        ax.plot([2, 1], [arm_y, arm_y - 1 - y_offset*0.5], color='#667eea', linewidth=6, alpha=0.8)
-        # Right arm  
-        ax.plot([8, 9], [arm_y, arm_y - 1 - y_offset*0.5], color='#667eea', linewidth=6, alpha=0.8)
+        _limb(draw, to_px, [2, 1], [arm_y, arm_y - 1 - y_offset*0.5])
+        _limb(draw, to_px, [8, 9], [arm_y, arm_y - 1 - y_offset*0.5])
         
         # Legs
-        ax.plot([6, 6], [3.5 + y_offset, 1.5], color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([7, 7], [3.5 + y_offset, 1.5], color='#667eea', linewidth=6, alpha=0.8)
-        
-        # Ground line
-        ax.plot([0, 10], [1.5, 1.5], color='#4F4F4F', linewidth=2, alpha=0.6)
-        
-        # Title and instructions
-        ax.text(5, 5.5, 'PUSH-UP FORM', ha='center', va='center', 
-                fontsize=16, color='#FAFAFA', weight='bold')
-        ax.text(5, 0.8, 'Lower chest to ground, push back up', ha='center', va='center',
-                fontsize=12, color='#FAFAFA', alpha=0.8)
+        _limb(draw, to_px, [6, 6], [3.5 + y_offset, 1.5])
+        _limb(draw, to_px, [7, 7], [3.5 + y_offset, 1.5])
         
         # Form indicator
         if y_offset < -0.2:
-            ax.text(5, 2.5, '⬇ DOWN POSITION', ha='center', va='center',
-                    fontsize=10, color='#48bb78', weight='bold')
+            _label(draw, to_px, 5, 2.5, 'DOWN POSITION', _HINT_SIZE, fill=_GOOD)
         elif y_offset > 0.2:
-            ax.text(5, 2.5, '⬆ UP POSITION', ha='center', va='center',
-                    fontsize=10, color='#667eea', weight='bold')
-    
-    anim = animation.FuncAnimation(fig, animate, frames=40, interval=100, repeat=True)
-    plt.tight_layout()
-    
-    # Save as base64 encoded GIF
-    buffer = io.BytesIO()
-    anim.save(buffer, format='gif', writer='pillow', fps=10)
-    buffer.seek(0)
-    gif_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close()
+            _label(draw, to_px, 5, 2.5, 'UP POSITION', _HINT_SIZE, fill=_ACCENT)
+        
+        frames.append(img)
     
-    return f"data:image/gif;base64,{gif_base64}"
+    return _encode_gif(frames)
 
-def create_squat_gif():
-    """Create animated squat form GIF"""
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 8)
-    ax.set_facecolor('#262730')
-    fig.patch.set_facecolor('#262730')
-    ax.axis('off')
+def _render_squat_gif():
+    """Render animated squat form GIF bytes"""
+    # Ground, title and instructions are drawn once and copied per frame
+    background = _background(8, 1.5, 'SQUAT FORM', 7.5, 'Lower hips back, keep chest up', 0.8)
+    frames = []
     
-    def animate(frame):
-        ax.clear()
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 8)
-        ax.set_facecolor('#262730')
-        ax.axis('off')
+    for frame in range(60):
+        img, draw, to_px = _new_frame(8, background)
         
         # Animation cycle
         t = frame / 30.0
-        y_offset = -1.2 * np.sin(t * 2 * np.pi) ** 2  # Squat down motion
+        y_offset = -1.2 * math.sin(t * 2 * math.pi) ** 2  # Squat down motion
         
         # Head
-        head_pos = (5, 6.5 + y_offset)
-        ax.add_patch(Circle(head_pos, 0.3, color='#667eea', alpha=0.8))
+        _head(draw, to_px, (5, 6.5 + y_offset))
         
         # Body (torso)
-        torso_top = (5, 6.2 + y_offset)
-        torso_bottom = (5, 4.5 + y_offset)
-        ax.plot([torso_top[0], torso_bottom[0]], [torso_top[1], torso_bottom[1]], 
-                color='#667eea', linewidth=8, alpha=0.8)
+        _limb(draw, to_px, [5, 5], [6.2 + y_offset, 4.5 + y_offset], width=_TORSO_WIDTH)
         
         # Arms (raised forward during squat)
         arm_extend = max(0, -y_offset) * 1.5
-        ax.plot([5, 3.5 - arm_extend], [5.5 + y_offset, 5.5 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([5, 6.5 + arm_extend], [5.5 + y_offset, 5.5 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
+        _limb(draw, to_px, [5, 3.5 - arm_extend], [5.5 + y_offset, 5.5 + y_offset])
+        _limb(draw, to_px, [5, 6.5 + arm_extend], [5.5 + y_offset, 5.5 + y_offset])
         
         # Legs
         leg_angle = max(0, -y_offset) * 0.8
         # Left leg
-        ax.plot([5, 4.5 - leg_angle], [4.5 + y_offset, 2.5 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([4.5 - leg_angle, 4.5 - leg_angle], [2.5 + y_offset, 1.5], 
-                color='#667eea', linewidth=6, alpha=0.8)
+        _limb(draw, to_px, [5, 4.5 - leg_angle], [4.5 + y_offset, 2.5 + y_offset])
+        _limb(draw, to_px, [4.5 - leg_angle, 4.5 - leg_angle], [2.5 + y_offset, 1.5])
         
         # Right leg
-        ax.plot([5, 5.5 + leg_angle], [4.5 + y_offset, 2.5 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([5.5 + leg_angle, 5.5 + leg_angle], [2.5 + y_offset, 1.5], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        
-        # Ground line
-        ax.plot([0, 10], [1.5, 1.5], color='#4F4F4F', linewidth=2, alpha=0.6)
-        
-        # Title and instructions
-        ax.text(5, 7.5, 'SQUAT FORM', ha='center', va='center', 
-                fontsize=16, color='#FAFAFA', weight='bold')
-        ax.text(5, 0.8, 'Lower hips back, keep chest up', ha='center', va='center',
-                fontsize=12, color='#FAFAFA', alpha=0.8)
+        _limb(draw, to_px, [5, 5.5 + leg_angle], [4.5 + y_offset, 2.5 + y_offset])
+        _limb(draw, to_px, [5.5 + leg_angle, 5.5 + leg_angle], [2.5 + y_offset, 1.5])
         
         # Form indicator
         if y_offset < -0.8:
-            ax.text(5, 3.8 + y_offset, '⬇ BOTTOM POSITION', ha='center', va='center',
-                    fontsize=10, color='#48bb78', weight='bold')
+            _label(draw, to_px, 5, 3.8 + y_offset, 'BOTTOM POSITION', _HINT_SIZE, fill=_GOOD)
         elif y_offset > -0.2:
-            ax.text(5, 3.8 + y_offset, '⬆ STANDING', ha='center', va='center',
-                    fontsize=10, color='#667eea', weight='bold')
-    
-    anim = animation.FuncAnimation(fig, animate, frames=60, interval=100, repeat=True)
-    plt.tight_layout()
-    
-    # Save as base64 encoded GIF
-    buffer = io.BytesIO()
-    anim.save(buffer, format='gif', writer='pillow', fps=10)
-    buffer.seek(0)
-    gif_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close()
+            _label(draw, to_px, 5, 3.8 + y_offset, 'STANDING', _HINT_SIZE, fill=_ACCENT)
+        
+        frames.append(img)
     
-    return f"data:image/gif;base64,{gif_base64}"
+    return _encode_gif(frames)
 
-def create_lunge_gif():
-    """Create animated lunge form GIF"""
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 8)
-    ax.set_facecolor('#262730')
-    fig.patch.set_facecolor('#262730')
-    ax.axis('off')
+def _render_lunge_gif():
+    """Render animated lunge form GIF bytes"""
+    # Ground, title and instructions are drawn once and copied per frame
+    background = _background(8, 1.5, 'LUNGE FORM', 7.5, 'Step forward, 90° angles, push back', 0.8)
+    frames = []
     
-    def animate(frame):
-        ax.clear()
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 8)
-        ax.set_facecolor('#262730')
-        ax.axis('off')
+    for frame in range(80):
+        img, draw, to_px = _new_frame(8, background)
         
         # Animation cycle
         t = frame / 40.0
-        lunge_offset = 1.5 * np.sin(t * 2 * np.pi)  # Forward/back motion
-        y_offset = -0.8 * np.abs(np.sin(t * 2 * np.pi))  # Up/down motion
+        lunge_offset = 1.5 * math.sin(t * 2 * math.pi)  # Forward/back motion
+        y_offset = -0.8 * abs(math.sin(t * 2 * math.pi))  # Up/down motion
+        hip_x = 5 + lunge_offset*0.3
         
         # Head
-        head_pos = (5 + lunge_offset*0.3, 6.5 + y_offset)
-        ax.add_patch(Circle(head_pos, 0.3, color='#667eea', alpha=0.8))
+        _head(draw, to_px, (hip_x, 6.5 + y_offset))
         
         # Body (torso)
-        torso_top = (5 + lunge_offset*0.3, 6.2 + y_offset)
-        torso_bottom = (5 + lunge_offset*0.3, 4.5 + y_offset)
-        ax.plot([torso_top[0], torso_bottom[0]], [torso_top[1], torso_bottom[1]], 
-                color='#667eea', linewidth=8, alpha=0.8)
+        _limb(draw, to_px, [hip_x, hip_x], [6.2 + y_offset, 4.5 + y_offset], width=_TORSO_WIDTH)
         
         # Arms
-        ax.plot([torso_top[0], torso_top[0] - 1], [5.5 + y_offset, 5.5 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([torso_top[0], torso_top[0] + 1], [5.5 + y_offset, 5.5 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
+        _limb(draw, to_px, [hip_x, hip_x - 1], [5.5 + y_offset, 5.5 + y_offset])
+        _limb(draw, to_px, [hip_x, hip_x + 1], [5.5 + y_offset, 5.5 + y_offset])
         
         # Legs - front leg
-        front_leg_x = 5 + lunge_offset*0.3 + lunge_offset
-        ax.plot([5 + lunge_offset*0.3, front_leg_x], [4.5 + y_offset, 3 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([front_leg_x, front_leg_x], [3 + y_offset, 1.5], 
-                color='#667eea', linewidth=6, alpha=0.8)
+        front_leg_x = hip_x + lunge_offset
+        _limb(draw, to_px, [hip_x, front_leg_x], [4.5 + y_offset, 3 + y_offset])
+        _limb(draw, to_px, [front_leg_x, front_leg_x], [3 + y_offset, 1.5])
         
         # Legs - back leg
-        back_leg_x = 5 + lunge_offset*0.3 - lunge_offset
-        ax.plot([5 + lunge_offset*0.3, back_leg_x], [4.5 + y_offset, 3 + y_offset], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([back_leg_x, back_leg_x], [3 + y_offset, 2], 
-                color='#667eea', linewidth=6, alpha=0.8)
-        
-        # Ground line
-        ax.plot([0, 10], [1.5, 1.5], color='#4F4F4F', linewidth=2, alpha=0.6)
-        
-        # Title and instructions
-        ax.text(5, 7.5, 'LUNGE FORM', ha='center', va='center', 
-                fontsize=16, color='#FAFAFA', weight='bold')
-        ax.text(5, 0.8, 'Step forward, 90° angles, push back', ha='center', va='center',
-                fontsize=12, color='#FAFAFA', alpha=0.8)
+        back_leg_x = hip_x - lunge_offset
+        _limb(draw, to_px, [hip_x, back_leg_x], [4.5 + y_offset, 3 + y_offset])
+        _limb(draw, to_px, [back_leg_x, back_leg_x], [3 + y_offset, 2])
         
         # Form indicator
         if abs(lunge_offset) > 1:
-            ax.text(5, 3.5 + y_offset, '⬇ LUNGE POSITION', ha='center', va='center',
-                    fontsize=10, color='#48bb78', weight='bold')
+            _label(draw, to_px, 5, 3.5 + y_offset, 'LUNGE POSITION', _HINT_SIZE, fill=_GOOD)
         else:
-            ax.text(5, 3.5 + y_offset, '⬆ STARTING POSITION', ha='center', va='center',
-                    fontsize=10, color='#667eea', weight='bold')
-    
-    anim = animation.FuncAnimation(fig, animate, frames=80, interval=100, repeat=True)
-    plt.tight_layout()
-    
-    # Save as base64 encoded GIF
-    buffer = io.BytesIO()
-    anim.save(buffer, format='gif', writer='pillow', fps=10)
-    buffer.seek(0)
-    gif_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close()
+            _label(draw, to_px, 5, 3.5 + y_offset, 'STARTING POSITION', _HINT_SIZE, fill=_ACCENT)
+        
+        frames.append(img)
     
-    return f"data:image/gif;base64,{gif_base64}"
+    return _encode_gif(frames)
 
-def create_plank_gif():
-    """Create animated plank form GIF"""
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 6)
-    ax.set_facecolor('#262730')
-    fig.patch.set_facecolor('#262730')
-    ax.axis('off')
+def _render_plank_gif():
+    """Render animated plank form GIF bytes"""
+    # Ground, title and instructions are drawn once and copied per frame
+    background = _background(6, 2.5, 'PLANK FORM', 5, 'Straight line from head to heels', 1.8)
     
-    def animate(frame):
-        ax.clear()
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 6)
-        ax.set_facecolor('#262730')
-        ax.axis('off')
+    # The breathing motion repeats every 15 frames, so draw one period of
+    # the figure and only add the timer per frame
+    poses = []
+    for frame in range(_PLANK_PERIOD):
+        img, draw, to_px = _new_frame(6, background)
         
         # Animation cycle - slight breathing motion
         t = frame / 30.0
-        breathe = 0.1 * np.sin(t * 4 * np.pi)
+        breathe = 0.1 * math.sin(t * 4 * math.pi)
         
         # Head
-        head_pos = (2, 3.5 + breathe)
-        ax.add_patch(Circle(head_pos, 0.3, color='#667eea', alpha=0.8))
+        _head(draw, to_px, (2, 3.5 + breathe))
         
         # Body (straight line plank)
-        body_start = (2, 3.5 + breathe)
-        body_end = (8, 3.5 + breathe)
-        ax.plot([body_start[0], body_end[0]], [body_start[1], body_end[1]], 
-                color='#667eea', linewidth=8, alpha=0.8)
+        _limb(draw, to_px, [2, 8], [3.5 + breathe, 3.5 + breathe], width=_TORSO_WIDTH)
         
         # Arms (supporting body)
-        ax.plot([2, 1.5], [3.5 + breathe, 2.5], color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([8, 8.5], [3.5 + breathe, 2.5], color='#667eea', linewidth=6, alpha=0.8)
+        _limb(draw, to_px, [2, 1.5], [3.5 + breathe, 2.5])
+        _limb(draw, to_px, [8, 8.5], [3.5 + breathe, 2.5])
         
         # Legs (straight)
-        ax.plot([5, 5], [3.5 + breathe, 2.5], color='#667eea', linewidth=6, alpha=0.8)
-        ax.plot([6, 6], [3.5 + breathe, 2.5], color='#667eea', linewidth=6, alpha=0.8)
-        
-        # Ground line
-        ax.plot([0, 10], [2.5, 2.5], color='#4F4F4F', linewidth=2, alpha=0.6)
+        _limb(draw, to_px, [5, 5], [3.5 + breathe, 2.5])
+        _limb(draw, to_px, [6, 6], [3.5 + breathe, 2.5])
         
         # Alignment guide line
-        ax.plot([2, 8], [3.5, 3.5], color='#48bb78', linewidth=2, alpha=0.6, linestyle='--')
-        
-        # Title and instructions
-        ax.text(5, 5, 'PLANK FORM', ha='center', va='center', 
-                fontsize=16, color='#FAFAFA', weight='bold')
-        ax.text(5, 1.8, 'Straight line from head to heels', ha='center', va='center',
-                fontsize=12, color='#FAFAFA', alpha=0.8)
+        _limb(draw, to_px, [2, 8], [3.5, 3.5], width=_GROUND_WIDTH, fill=_GUIDE)
         
         # Form indicator
-        ax.text(5, 4.2, 'HOLD STEADY', ha='center', va='center',
-                fontsize=10, color='#48bb78', weight='bold')
+        _label(draw, to_px, 5, 4.2, 'HOLD STEADY', _HINT_SIZE, fill=_GOOD)
+        
+        poses.append(img)
+    
+    frames = []
+    for frame in range(300):
+        img, draw, to_px = _new_frame(6, poses[frame % _PLANK_PERIOD])
         
         # Timer simulation
         timer = int((frame % 300) / 10)  # 30 second cycle
-        ax.text(9, 4.5, f'{timer}s', ha='center', va='center',
-                fontsize=14, color='#667eea', weight='bold')
+        _label(draw, to_px, 9, 4.5, f'{timer}s', _TIMER_SIZE, fill=_ACCENT)
+        
+        frames.append(img)
     
-    anim = animation.FuncAnimation(fig, animate, frames=300, interval=100, repeat=True)
-    plt.tight_layout()
+    return _encode_gif(frames)
+
+# Exercise name -> renderer, used by the build step and as a fallback
+_GIF_RENDERERS = {
+    'pushup': _render_pushup_gif,
+    'squat': _render_squat_gif,
+    'lunge': _render_lunge_gif,
+    'plank': _render_plank_gif
+}
+
+def _write_gif(name):
+    """Render one exercise GIF into GIF_DIR and return its path"""
+    os.makedirs(GIF_DIR, exist_ok=True)
+    path = os.path.join(GIF_DIR, f'{name}.gif')
+    with open(path, 'wb') as f:
+        f.write(_GIF_RENDERERS[name]())
+    return path
+
+def build_gifs():
+    """Render every exercise GIF into GIF_DIR"""
+    for name in _GIF_RENDERERS:
+        _write_gif(name)
+        print(f"✓ {name.title()} GIF generated")
+
+def gif_path(name):
+    """Get the path of an exercise GIF, building it if it hasn't been built
     
-    # Save as base64 encoded GIF
-    buffer = io.BytesIO()
-    anim.save(buffer, format='gif', writer='pillow', fps=10)
-    buffer.seek(0)
-    gif_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close()
+    Pass the path to st.image to serve the file as-is instead of inlining
+    it as a base64 data URI.
+    """
+    path = os.path.join(GIF_DIR, f'{name}.gif')
+    return path if os.path.exists(path) else _write_gif(name)
+
+@st.cache_data(show_spinner=False, ttl=24*60*60)
+def _gif_data_uri(name):
+    """Read a built GIF as a data URI, rendering it if it hasn't been built"""
+    try:
+        with open(os.path.join(GIF_DIR, f'{name}.gif'), 'rb') as f:
+            gif_bytes = f.read()
+    except FileNotFoundError:
+        gif_bytes = _GIF_RENDERERS[name]()
     
-    return f"data:image/gif;base64,{gif_base64}"
+    return f"data:image/gif;base64,{base64.b64encode(gif_bytes).decode()}"
+
+def create_pushup_gif():
+    """Create animated pushup form GIF"""
+    return _gif_data_uri('pushup')
+
+def create_squat_gif():
+    """Create animated squat form GIF"""
+    return _gif_data_uri('squat')
+
+def create_lunge_gif():
+    """Create animated lunge form GIF"""
+    return _gif_data_uri('lunge')
+
+def create_plank_gif():
+    """Create animated plank form GIF"""
+    return _gif_data_uri('plank')
 
 if __name__ == "__main__":
     print("Generating exercise form GIFs...")
     
-    pushup_gif = create_pushup_gif()
-    print("✓ Push-up GIF generated")
-    
-    squat_gif = create_squat_gif()
-    print("✓ Squat GIF generated")
-    
-    lunge_gif = create_lunge_gif()
-    print("✓ Lunge GIF generated")
-    
-    plank_gif = create_plank_gif()
-    print("✓ Plank GIF generated")
+    build_gifs()
     
-    print("All exercise form GIFs generated successfully!")
\ No newline at end of file
+    print("All exercise form GIFs generated successfully!")
@@ -1,77 +1,172 @@
 import numpy as np
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
-import pickle
+import joblib
 import os
+from functools import lru_cache
+
+# ONNX Runtime is optional; without it single-row predictions walk the
+# packed forest from _compile_forest() instead
+try:
+    import onnxruntime
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    onnxruntime = None
+
+# Model features, in column order, and the synthetic training record layout
+_FEATURES = ('height', 'weight', 'age', 'gender', 'bmi')
+_TRAINING_DTYPE = np.dtype([
+    ('height', 'f8'), ('weight', 'f8'), ('age', 'i2'), ('gender', 'i1'), ('bmi', 'f8'),
+    ('body_type', 'U9')
+])
+
+# Rule-based fallback body types, indexed by _rule_based_body_types() codes
+_RULE_BODY_TYPES = np.array(['ectomorph', 'mesomorph', 'endomorph'])
+
+def _rule_based_body_types(bmi):
+    """Classify a BMI or array of BMIs: below 20 ectomorph, above 27 endomorph"""
+    return _RULE_BODY_TYPES[np.add(bmi >= 20, bmi > 27, dtype=int)]
+
+def _sample_measurements(rng, n, height, weight, male_extra):
+    """Draw n rows of (height, weight, age, gender, bmi) for one body type"""
+    heights = rng.normal(height[0], height[1], n)  # cm
+    weights = rng.normal(weight[0], weight[1], n)  # kg
+    ages = rng.integers(18, 65, n)
+    genders = rng.integers(0, 2, n)                # 0: Female, 1: Male
+    
+    # Adjust for gender
+    male = genders == 1
+    heights[male] += male_extra[0]
+    weights[male] += male_extra[1]
+    
+    bmi = weights / ((heights/100) ** 2)
+    return np.column_stack([heights, weights, ages, genders, bmi])
+
+def _compile_onnx(model):
+    """Convert a fitted forest to an ONNX Runtime predict-proba function"""
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[('input', FloatTensorType([None, 5]))],
+        options={id(model): {'zipmap': False}}
+    )
+    session = onnxruntime.InferenceSession(onnx_model.SerializeToString(), providers=['CPUExecutionProvider'])
+    
+    def predict_proba(features):
+        # ONNX Runtime returns float32; callers expect float64 like sklearn
+        return session.run(None, {'input': features.astype(np.float32)})[1].astype(np.float64)
+    
+    return predict_proba
+
+def _compile_forest(model):
+    """Pack a fitted forest into flat node arrays and return a predict-proba function
+    
+    Every tree advances one level per step for every row in a single NumPy
+    operation, so a prediction costs max_depth vectorized steps rather than
+    a Python call per tree.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+    
+    # Child indices are shifted into the packed arrays; leaves keep -1
+    feature = np.concatenate([tree.feature for tree in trees])
+    threshold = np.concatenate([tree.threshold for tree in trees])
+    left = np.concatenate([np.where(tree.children_left >= 0, tree.children_left + offset, -1)
+                           for tree, offset in zip(trees, offsets)])
+    right = np.concatenate([np.where(tree.children_right >= 0, tree.children_right + offset, -1)
+                            for tree, offset in zip(trees, offsets)])
+    
+    # Per-node class probabilities, as each tree's predict_proba reports them;
+    # float32 is plenty for probabilities and halves the array
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+    value = (value / value.sum(axis=1, keepdims=True)).astype(np.float32)
+    max_depth = max(tree.max_depth for tree in trees)
+    
+    def predict_proba(features):
+        # scikit-learn compares float32 features against the thresholds
+        rows = features.astype(np.float32)
+        row_idx = np.arange(len(rows))[:, None]
+        
+        # One (rows, trees) array of current nodes, advanced together
+        node = np.broadcast_to(offsets, (len(rows), len(offsets)))
+        for _ in range(max_depth):
+            go_left = rows[row_idx, feature[node]] <= threshold[node]
+            node = np.where(left[node] < 0, node, np.where(go_left, left[node], right[node]))
+        
+        # Averaged in float64 so callers get plain Python-compatible floats
+        return value[node].mean(axis=1, dtype=np.float64)
+    
+    return predict_proba
 
 class BodyTypeClassifier:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.scaler = StandardScaler()
+    def __init__(self, weights=None):
+        # Set by set_weights(), loading or _train_model()
+        self.model = None
+        self.scaler = None
         self.is_trained = False
-        self._load_or_train_model()
+        self._predict_fn = None
+        self._mean = self._scale = None
+        self._cached_predict = lru_cache(maxsize=4096)(self._predict_body_type)
+        
+        # Reuse weights from get_weights() when given, otherwise load or train
+        if weights is not None:
+            self.set_weights(weights)
+        else:
+            self._load_or_train_model()
+    
+    def get_weights(self):
+        """Get the fitted model and scaler so they can be cached"""
+        return {
+            'model': self.model,
+            'scaler': self.scaler,
+            'is_trained': self.is_trained
+        }
+    
+    def set_weights(self, weights):
+        """Restore the model and scaler from get_weights() output"""
+        self.model = weights['model']
+        self.scaler = weights['scaler']
+        self.is_trained = weights['is_trained']
+        self._predict_fn = None
+        self._cached_predict.cache_clear()
+        if self.is_trained:
+            self._set_scaler_stats()
+    
+    def _set_scaler_stats(self):
+        """Copy the fitted scaler's statistics out as plain arrays"""
+        # Kept in float64 so scaled features match scaler.transform() exactly
+        self._mean = np.array(self.scaler.mean_, dtype=np.float64)
+        self._scale = np.array(self.scaler.scale_, dtype=np.float64)
+    
+    def _get_predict_fn(self):
+        """Get the compiled predict-proba function for the fitted forest"""
+        if self._predict_fn is None:
+            self._predict_fn = _compile_onnx(self.model) if onnxruntime is not None else _compile_forest(self.model)
+        return self._predict_fn
     
     def _generate_training_data(self):
         """Generate synthetic training data for body type classification"""
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         
-        data = []
+        # Ectomorph characteristics (tall, lean); typically lower BMI
+        ecto = _sample_measurements(rng, 300, (175, 10), (60, 8), (5, 15))
+        ecto = ecto[ecto[:, 4] < 25]
         
-        # Ectomorph characteristics (tall, lean)
-        for _ in range(300):
-            height = np.random.normal(175, 10)  # cm
-            weight = np.random.normal(60, 8)    # kg
-            age = np.random.randint(18, 65)
-            gender = np.random.choice([0, 1])   # 0: Female, 1: Male
-            
-            # Adjust for gender
-            if gender == 1:  # Male
-                height += 5
-                weight += 15
-            
-            bmi = weight / ((height/100) ** 2)
-            
-            # Ectomorphs typically have lower BMI
-            if bmi < 25:
-                data.append([height, weight, age, gender, bmi, 'ectomorph'])
-        
-        # Mesomorph characteristics (athletic build)
-        for _ in range(300):
-            height = np.random.normal(170, 8)
-            weight = np.random.normal(70, 10)
-            age = np.random.randint(18, 65)
-            gender = np.random.choice([0, 1])
-            
-            if gender == 1:  # Male
-                height += 8
-                weight += 20
-            
-            bmi = weight / ((height/100) ** 2)
-            
-            # Mesomorphs typically have moderate BMI with muscle
-            if 20 <= bmi <= 27:
-                data.append([height, weight, age, gender, bmi, 'mesomorph'])
-        
-        # Endomorph characteristics (rounder build)
-        for _ in range(300):
-            height = np.random.normal(165, 8)
-            weight = np.random.normal(80, 15)
-            age = np.random.randint(18, 65)
-            gender = np.random.choice([0, 1])
-            
-            if gender == 1:  # Male
-                height += 10
-                weight += 25
-            
-            bmi = weight / ((height/100) ** 2)
-            
-            # Endomorphs typically have higher BMI
-            if bmi >= 23:
-                data.append([height, weight, age, gender, bmi, 'endomorph'])
+        # Mesomorph characteristics (athletic build); moderate BMI with muscle
+        meso = _sample_measurements(rng, 300, (170, 8), (70, 10), (8, 20))
+        meso = meso[(meso[:, 4] >= 20) & (meso[:, 4] <= 27)]
+        
+        # Endomorph characteristics (rounder build); typically higher BMI
+        endo = _sample_measurements(rng, 300, (165, 8), (80, 15), (10, 25))
+        endo = endo[endo[:, 4] >= 23]
         
-        df = pd.DataFrame(data, columns=['height', 'weight', 'age', 'gender', 'bmi', 'body_type'])
-        return df
+        # Fill a record array column by column; nothing here needs a DataFrame
+        measurements = np.vstack([ecto, meso, endo])
+        data = np.empty(len(measurements), dtype=_TRAINING_DTYPE)
+        for i, name in enumerate(_FEATURES):
+            data[name] = measurements[:, i]
+        data['body_type'] = np.repeat(['ectomorph', 'mesomorph', 'endomorph'], [len(ecto), len(meso), len(endo)])
+        return data
     
     def _load_or_train_model(self):
         """Load existing model or train new one"""
@@ -80,10 +175,9 @@ class BodyTypeClassifier:
         
         if os.path.exists(model_path) and os.path.exists(scaler_path):
             try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
+                self.model = joblib.load(model_path, mmap_mode='r')
+                self.scaler = joblib.load(scaler_path, mmap_mode='r')
+                self._set_scaler_stats()
                 self.is_trained = True
                 return
             except:
@@ -96,24 +190,30 @@ class BodyTypeClassifier:
         """Train the body type classification model"""
         try:
             # Generate training data
-            df = self._generate_training_data()
+            data = self._generate_training_data()
             
             # Prepare features and target
-            X = df[['height', 'weight', 'age', 'gender', 'bmi']].values
-            y = df['body_type'].values
+            X = np.column_stack([data[name] for name in _FEATURES]).astype(np.float64)
+            y = data['body_type']
             
             # Scale features
+            self.scaler = StandardScaler()
             X_scaled = self.scaler.fit_transform(X)
+            self._set_scaler_stats()
             
-            # Train model
+            # Train model; ~900 training rows don't need deep trees, and
+            # shallow ones keep the saved model small and predictions to at
+            # most 8 steps
+            self.model = RandomForestClassifier(
+                n_estimators=50, max_depth=8, min_samples_leaf=10, random_state=42, n_jobs=-1
+            )
             self.model.fit(X_scaled, y)
             
             # Save model and scaler
             os.makedirs('models', exist_ok=True)
-            with open('models/body_type_model.pkl', 'wb') as f:
-                pickle.dump(self.model, f)
-            with open('models/body_type_scaler.pkl', 'wb') as f:
-                pickle.dump(self.scaler, f)
+            # Saved uncompressed so joblib.load can memory-map the arrays
+            joblib.dump(self.model, 'models/body_type_model.pkl')
+            joblib.dump(self.scaler, 'models/body_type_scaler.pkl')
             
             self.is_trained = True
             
@@ -123,26 +223,59 @@ class BodyTypeClassifier:
     
     def predict_body_type(self, height, weight, age, gender):
         """Predict body type based on user characteristics"""
+        # Round to the precision of the BMI form inputs so repeat predictions
+        # are cache hits; inputs that can't be normalized fall back to the
+        # rules as before
+        try:
+            key = (round(height, 1), round(weight, 1), int(age), gender.lower())
+        except Exception as e:
+            print(f"Error predicting body type: {str(e)}")
+            return self._rule_based_classification(height, weight, age, gender)
+        
+        # Copy the probabilities since the cached result is shared by every session
+        result = self._cached_predict(*key)
+        return dict(result, probabilities=dict(result['probabilities']))
+    
+    def predict_body_type_batch(self, measurements):
+        """Predict body types for rows of [height, weight, age, gender]
+        
+        Gender is 1 for male and 0 otherwise. Returns the predicted body types
+        and their class probabilities in model.classes_ order; without a
+        trained model the types come from the BMI rules and the
+        probabilities are None.
+        """
+        measurements = np.asarray(measurements, dtype=float).reshape(-1, 4)
+        
+        # Calculate BMI and scale features for every row at once
+        bmi = measurements[:, 1] / ((measurements[:, 0]/100) ** 2)
+        if not self.is_trained:
+            return _rule_based_body_types(bmi), None
+        
+        # Apply the scaler's cached statistics directly, skipping transform()'s
+        # input validation; both predict backends compare in float32
+        features = np.column_stack([measurements, bmi])
+        features_scaled = ((features - self._mean) / self._scale).astype(np.float32)
+        
+        # Predict (predict() is argmax of predict_proba(), so derive the
+        # labels from one pass over the forest instead of two)
+        probabilities = self._get_predict_fn()(features_scaled)
+        return self.model.classes_[probabilities.argmax(axis=1)], probabilities
+    
+    def _predict_body_type(self, height, weight, age, gender):
+        """Predict body type from rounded inputs"""
         try:
             if not self.is_trained:
                 return self._rule_based_classification(height, weight, age, gender)
             
-            # Calculate BMI
-            bmi = weight / ((height/100) ** 2)
-            
-            # Prepare features
-            gender_encoded = 1 if gender.lower() == 'male' else 0
-            features = np.array([[height, weight, age, gender_encoded, bmi]])
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Predict
-            prediction = self.model.predict(features_scaled)[0]
-            probabilities = self.model.predict_proba(features_scaled)[0]
+            # Predict as a batch of one
+            gender_encoded = 1 if gender == 'male' else 0
+            body_types, probabilities = self.predict_body_type_batch([[height, weight, age, gender_encoded]])
+            probabilities = probabilities[0]
+            best = probabilities.argmax()
+            prediction = body_types[0]
             
             # Get confidence
-            confidence = max(probabilities)
+            confidence = probabilities[best]
             
             return {
                 'body_type': prediction,
@@ -161,15 +294,8 @@ class BodyTypeClassifier:
         """Simple rule-based body type classification as fallback"""
         bmi = weight / ((height/100) ** 2)
         
-        if bmi < 20:
-            body_type = 'ectomorph'
-        elif bmi > 27:
-            body_type = 'endomorph'
-        else:
-            body_type = 'mesomorph'
-        
         return {
-            'body_type': body_type,
+            'body_type': str(_rule_based_body_types(bmi)),
             'confidence': 0.7,  # Default confidence
             'probabilities': {
                 'ectomorph': 0.33,
@@ -1,28 +1,88 @@
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-import pickle
+import joblib
 import os
+import json
+from types import MappingProxyType
 import streamlit as st
 
+# Saved complexity table, written by _train_model()
+_COMPLEXITY_TABLE_PATH = 'models/complexity_table.pkl'
+
+# Recommendation exercise pools per goal, flattened from their categories;
+# built once and shared read-only by every recommendation
+_GOAL_EXERCISE_POOLS = MappingProxyType({
+    'weight_loss': np.array([
+        'Jumping Jacks', 'Burpees', 'Mountain Climbers', 'High Knees',  # cardio
+        'Squats', 'Push-ups', 'Lunges', 'Plank'                         # strength
+    ]),
+    'muscle_gain': np.array([
+        'Deadlifts', 'Squats', 'Bench Press', 'Pull-ups',               # compound
+        'Bicep Curls', 'Tricep Dips', 'Shoulder Press'                  # isolation
+    ]),
+    'endurance': np.array([
+        'Jumping Jacks', 'Mountain Climbers', 'Burpees',                # cardio
+        'Push-ups', 'Squats', 'Plank', 'Lunges'                         # bodyweight
+    ]),
+    'strength': np.array([
+        'Deadlifts', 'Squats', 'Bench Press', 'Pull-ups',               # compound
+        'Shoulder Press', 'Leg Press'                                   # power
+    ])
+})
+for _pool in _GOAL_EXERCISE_POOLS.values():
+    _pool.flags.writeable = False
+
+# Set choices and [low, high) rep range per experience level
+_SETS_AND_REPS = {
+    'beginner': ((2, 3), (8, 12)),
+    'intermediate': ((3, 4), (10, 15)),
+    'advanced': ((4, 5), (12, 20))
+}
+
 class LSTMRecommender:
-    def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=50, random_state=42)
-        self.exercise_encoder = LabelEncoder()
-        self.scaler = StandardScaler()
+    # Exercise library shared by every instance, read on first use
+    _shared_exercise_library = None
+    
+    def __init__(self, weights=None):
+        # Mean next-workout complexity per (body_type, goal, experience)
+        self.complexity_table = {}
+        self.default_complexity = 4
         self.sequence_length = 7  # 7 days of workout history
         self.is_trained = False
         self.exercise_library = self._load_exercise_library()
         
-        # Try to load pre-trained model, otherwise train new one
-        self._load_or_train_model()
+        # Reuse weights from get_weights() when given, otherwise try to
+        # load pre-trained model or train new one
+        if weights is not None:
+            self.set_weights(weights)
+        else:
+            self._load_or_train_model()
+    
+    def get_weights(self):
+        """Get the fitted complexity table so it can be cached"""
+        return {
+            'complexity_table': self.complexity_table,
+            'default_complexity': self.default_complexity,
+            'is_trained': self.is_trained
+        }
+    
+    def set_weights(self, weights):
+        """Restore the complexity table from get_weights() output"""
+        self.complexity_table = weights['complexity_table']
+        self.default_complexity = weights['default_complexity']
+        self.is_trained = weights['is_trained']
     
     def _load_exercise_library(self):
-        """Load exercise library with categories and muscle groups"""
+        """Load exercise library with categories and muscle groups, once per process"""
+        if LSTMRecommender._shared_exercise_library is None:
+            LSTMRecommender._shared_exercise_library = self._read_exercise_library()
+        return LSTMRecommender._shared_exercise_library
+    
+    def _read_exercise_library(self):
+        """Read the exercise library file, or build the fallback library"""
         try:
             with open('data/exercise_library.json', 'r') as f:
-                return pd.DataFrame(eval(f.read()))
+                return pd.DataFrame(json.load(f))
         except:
             # Fallback exercise library
             return pd.DataFrame({
@@ -44,137 +104,57 @@ class LSTMRecommender:
         np.random.seed(42)
         
         # User profiles
-        body_types = ['ectomorph', 'mesomorph', 'endomorph']
-        goals = ['weight_loss', 'muscle_gain', 'endurance', 'strength']
-        experience_levels = ['beginner', 'intermediate', 'advanced']
+        body_types = np.array(['ectomorph', 'mesomorph', 'endomorph'])
+        goals = np.array(['weight_loss', 'muscle_gain', 'endurance', 'strength'])
+        experience_levels = np.array(['beginner', 'intermediate', 'advanced'])
         
-        data = []
+        # Draw all 1000 random user profiles and their workout sequences up front
+        n_users = 1000
+        user_body_types = np.random.choice(body_types, n_users)
+        user_goals = np.random.choice(goals, n_users)
+        user_experience = np.random.choice(experience_levels, n_users)
+        user_bmi = np.random.normal(25, 5, n_users)  # BMI around 25
+        user_age = np.random.randint(18, 65, n_users)
+        sequences = self._generate_workout_sequences(n_users)
         
-        for _ in range(1000):  # Generate 1000 user sequences
-            # Random user profile
-            body_type = np.random.choice(body_types)
-            goal = np.random.choice(goals)
-            experience = np.random.choice(experience_levels)
-            bmi = np.random.normal(25, 5)  # BMI around 25
-            age = np.random.randint(18, 65)
-            
-            # Generate workout sequence based on profile
-            sequence = self._generate_workout_sequence(body_type, goal, experience, bmi, age)
-            
-            for i in range(len(sequence) - 1):
-                data.append({
-                    'body_type': body_type,
-                    'goal': goal,
-                    'experience': experience,
-                    'bmi': bmi,
-                    'age': age,
-                    'workout_history': sequence[:i+1],
-                    'next_workout': sequence[i+1]
-                })
+        # One row per user per day that has a next day to predict
+        n_days = sequences.shape[1] - 1
+        user = np.repeat(np.arange(n_users), n_days)
+        day = np.tile(np.arange(n_days), n_users)
         
-        return pd.DataFrame(data)
+        return pd.DataFrame({
+            'body_type': user_body_types[user],
+            'goal': user_goals[user],
+            'experience': user_experience[user],
+            'bmi': user_bmi[user],
+            'age': user_age[user],
+            'history_length': np.minimum(day + 1, self.sequence_length),
+            'next_workout': sequences[user, day + 1]
+        })
     
-    def _generate_workout_sequence(self, body_type, goal, experience, bmi, age):
-        """Generate realistic workout sequence based on user profile"""
-        exercises = self.exercise_library['exercise'].tolist()
+    def _generate_workout_sequences(self, n_users):
+        """Generate 14-day sequences of per-day exercise counts, 0 on rest days"""
+        # Training only looks at how many exercises each workout has, so
+        # draw the counts directly: 3-5 exercises per workout
+        sequences = np.random.randint(3, 6, (n_users, 14))
         
-        # Define exercise preferences based on goals
-        goal_exercises = {
-            'weight_loss': ['Burpees', 'Jumping Jacks', 'Mountain Climbers', 'Squats', 'Lunges'],
-            'muscle_gain': ['Push-ups', 'Pull-ups', 'Deadlifts', 'Bench Press', 'Squats'],
-            'endurance': ['Jumping Jacks', 'Mountain Climbers', 'Burpees', 'Plank'],
-            'strength': ['Deadlifts', 'Bench Press', 'Squats', 'Shoulder Press', 'Pull-ups']
-        }
+        # Rest day every 7th day
+        sequences[:, 6::7] = 0
         
-        # Body type preferences
-        body_type_exercises = {
-            'ectomorph': ['Deadlifts', 'Squats', 'Bench Press', 'Pull-ups'],  # Compound movements
-            'mesomorph': ['Push-ups', 'Pull-ups', 'Squats', 'Lunges'],       # Balanced
-            'endomorph': ['Burpees', 'Jumping Jacks', 'Mountain Climbers']   # High intensity
-        }
-        
-        preferred_exercises = list(set(goal_exercises[goal] + body_type_exercises[body_type]))
-        
-        # Generate 14-day sequence
-        sequence = []
-        for day in range(14):
-            if day % 7 == 6:  # Rest day every 7th day
-                sequence.append('Rest')
-            else:
-                # Select 3-5 exercises per workout
-                workout_size = np.random.randint(3, 6)
-                daily_exercises = np.random.choice(preferred_exercises, size=workout_size, replace=False)
-                sequence.append(','.join(daily_exercises))
-        
-        return sequence
+        return sequences
     
     def _prepare_training_data(self, df):
-        """Prepare data for LSTM training"""
-        # Encode categorical variables
-        df['body_type_encoded'] = self.exercise_encoder.fit_transform(df['body_type'])
-        
-        # Create sequences
-        X_sequences = []
-        X_features = []
-        y = []
-        
-        for idx, row in df.iterrows():
-            history = row['workout_history']
-            if len(history) >= self.sequence_length:
-                # Get last sequence_length workouts
-                sequence = history[-self.sequence_length:]
-                
-                # Encode workout sequence
-                encoded_sequence = []
-                for workout in sequence:
-                    if workout == 'Rest':
-                        encoded_sequence.append(0)
-                    else:
-                        # Simple encoding: number of exercises
-                        encoded_sequence.append(len(workout.split(',')))
-                
-                X_sequences.append(encoded_sequence)
-                
-                # User features
-                features = [
-                    row['body_type_encoded'],
-                    ['weight_loss', 'muscle_gain', 'endurance', 'strength'].index(row['goal']),
-                    ['beginner', 'intermediate', 'advanced'].index(row['experience']),
-                    row['bmi'],
-                    row['age']
-                ]
-                X_features.append(features)
-                
-                # Target: next workout complexity
-                next_workout = row['next_workout']
-                if next_workout == 'Rest':
-                    y.append(0)
-                else:
-                    y.append(len(next_workout.split(',')))
-        
-        X_sequences = np.array(X_sequences)
-        X_features = np.array(X_features)
-        y = np.array(y)
-        
-        # Normalize features
-        X_features = self.scaler.fit_transform(X_features)
-        
-        return X_sequences, X_features, y
-    
-    def _build_model(self, feature_dim):
-        """Build Random Forest model"""
-        model = RandomForestRegressor(n_estimators=50, random_state=42)
-        return model
+        """Keep rows with a full history window, with their next-workout complexity"""
+        full_window = df['history_length'] >= self.sequence_length
+        return df.loc[full_window, ['body_type', 'goal', 'experience']].assign(
+            complexity=df.loc[full_window, 'next_workout']
+        )
     
     def _load_or_train_model(self):
-        """Load existing model or train new one"""
-        model_path = 'models/rf_model.pkl'
-        
-        if os.path.exists(model_path):
+        """Load existing complexity table or train new one"""
+        if os.path.exists(_COMPLEXITY_TABLE_PATH):
             try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                self.is_trained = True
+                self.set_weights(joblib.load(_COMPLEXITY_TABLE_PATH))
                 return
             except:
                 pass
@@ -183,26 +163,20 @@ class LSTMRecommender:
         self._train_model()
     
     def _train_model(self):
-        """Train the Random Forest model"""
+        """Fit the complexity table from synthetic training data"""
         try:
-            # Generate training data
-            df = self._generate_training_data()
-            
-            # Prepare data
-            X_sequences, X_features, y = self._prepare_training_data(df)
+            # Generate and prepare training data
+            df = self._prepare_training_data(self._generate_training_data())
             
-            # Build model
-            self.model = self._build_model(X_features.shape[1])
-            
-            # Train model using features (not sequences for RF)
-            self.model.fit(X_features, y)
+            # Only the categorical profile predicts complexity in the training
+            # data, so a mean per profile cell replaces a fitted regressor
+            self.complexity_table = df.groupby(['body_type', 'goal', 'experience'])['complexity'].mean().to_dict()
+            self.default_complexity = df['complexity'].mean()
+            self.is_trained = True
             
-            # Save model
+            # Save table
             os.makedirs('models', exist_ok=True)
-            with open('models/rf_model.pkl', 'wb') as f:
-                pickle.dump(self.model, f)
-            
-            self.is_trained = True
+            joblib.dump(self.get_weights(), _COMPLEXITY_TABLE_PATH)
             
         except Exception as e:
             st.error(f"Error training ML model: {str(e)}")
@@ -211,104 +185,76 @@ class LSTMRecommender:
     
     def _create_fallback_model(self):
         """Create a simple fallback model"""
-        self.model = RandomForestRegressor(n_estimators=10, random_state=42)
+        self.complexity_table = {}
+        self.default_complexity = 4
         self.is_trained = True
     
-    def recommend_workout(self, user_profile, workout_history=None):
-        """Generate workout recommendations based on user profile and history"""
+    def predict_complexity(self, user_profile, goal=None):
+        """Predict the number of exercises for the next workout"""
+        goal = goal or user_profile.get('goal', 'general_fitness')
+        key = (
+            user_profile.get('body_type', 'mesomorph'),
+            goal,
+            str(user_profile.get('experience', 'beginner')).lower()
+        )
+        
+        # Profiles outside the training data get the overall mean
+        complexity = self.complexity_table.get(key, self.default_complexity)
+        return max(1, int(round(complexity)))
+    
+    def recommend_workout(self, user_profile, workout_history=None, complexity=None, goal=None):
+        """Generate workout recommendations based on user profile and history
+        
+        Pass a complexity from an earlier predict_complexity() call to skip the model.
+        A goal overrides the profile's own goal without copying the profile.
+        """
         try:
             if not self.is_trained:
-                return self._fallback_recommendation(user_profile)
-            
-            # Get user features
-            body_type_map = {'ectomorph': 0, 'mesomorph': 1, 'endomorph': 2}
-            goal_map = {'weight_loss': 0, 'muscle_gain': 1, 'endurance': 2, 'strength': 3}
-            experience_map = {'beginner': 0, 'intermediate': 1, 'advanced': 2}
-            
-            features = np.array([[
-                body_type_map.get(user_profile.get('body_type', 'mesomorph'), 1),
-                goal_map.get(user_profile.get('goal', 'general_fitness'), 0),
-                experience_map.get(user_profile.get('experience', 'beginner'), 0),
-                user_profile.get('bmi', 25),
-                user_profile.get('age', 30)
-            ]])
+                return self._fallback_recommendation(user_profile, goal)
             
-            # Normalize features
-            features = self.scaler.transform(features)
-            
-            # Predict workout complexity
-            if hasattr(self.model, 'predict') and self.is_trained:
-                complexity = self.model.predict(features)[0]
-            else:
-                complexity = 4  # Default complexity
+            if complexity is None:
+                complexity = self.predict_complexity(user_profile, goal)
             
             # Generate workout based on complexity and profile
-            return self._generate_recommended_workout(user_profile, max(1, int(complexity)))
+            return self._generate_recommended_workout(user_profile, complexity, goal)
             
         except Exception as e:
             st.error(f"Error generating recommendation: {str(e)}")
-            return self._fallback_recommendation(user_profile)
+            return self._fallback_recommendation(user_profile, goal)
     
-    def _generate_recommended_workout(self, user_profile, complexity):
+    def _generate_recommended_workout(self, user_profile, complexity, goal=None):
         """Generate workout based on predicted complexity and user profile"""
-        goal = user_profile.get('goal', 'general_fitness')
+        goal = goal or user_profile.get('goal', 'general_fitness')
         body_type = user_profile.get('body_type', 'mesomorph')
         experience = user_profile.get('experience', 'beginner')
         
-        # Exercise selection based on goal and body type
-        exercise_pool = {
-            'weight_loss': {
-                'cardio': ['Jumping Jacks', 'Burpees', 'Mountain Climbers', 'High Knees'],
-                'strength': ['Squats', 'Push-ups', 'Lunges', 'Plank']
-            },
-            'muscle_gain': {
-                'compound': ['Deadlifts', 'Squats', 'Bench Press', 'Pull-ups'],
-                'isolation': ['Bicep Curls', 'Tricep Dips', 'Shoulder Press']
-            },
-            'endurance': {
-                'cardio': ['Jumping Jacks', 'Mountain Climbers', 'Burpees'],
-                'bodyweight': ['Push-ups', 'Squats', 'Plank', 'Lunges']
-            },
-            'strength': {
-                'compound': ['Deadlifts', 'Squats', 'Bench Press', 'Pull-ups'],
-                'power': ['Shoulder Press', 'Leg Press']
-            }
-        }
-        
-        # Select exercises based on goal
-        goal_exercises = exercise_pool.get(goal, exercise_pool['weight_loss'])
+        rng = np.random.default_rng()
         
-        # Flatten exercise list
-        all_exercises = []
-        for category in goal_exercises.values():
-            all_exercises.extend(category)
+        # Select exercises based on goal and complexity
+        goal_exercises = _GOAL_EXERCISE_POOLS.get(goal, _GOAL_EXERCISE_POOLS['weight_loss'])
+        num_exercises = min(complexity, len(goal_exercises))
+        selected_exercises = rng.choice(goal_exercises, size=num_exercises, replace=False)
         
-        # Select exercises based on complexity
-        num_exercises = min(complexity, len(all_exercises))
-        selected_exercises = np.random.choice(all_exercises, size=num_exercises, replace=False)
+        # Generate sets and reps based on experience, all at once
+        set_choices, (reps_low, reps_high) = _SETS_AND_REPS.get(experience, _SETS_AND_REPS['advanced'])
+        sets = rng.choice(set_choices, size=num_exercises)
+        reps = rng.integers(reps_low, reps_high, size=num_exercises)
         
-        # Generate sets and reps based on experience
-        workout = []
-        for exercise in selected_exercises:
-            if experience == 'beginner':
-                sets, reps = np.random.choice([2, 3]), np.random.randint(8, 12)
-            elif experience == 'intermediate':
-                sets, reps = np.random.choice([3, 4]), np.random.randint(10, 15)
-            else:  # advanced
-                sets, reps = np.random.choice([4, 5]), np.random.randint(12, 20)
-            
-            workout.append({
-                'exercise': exercise,
-                'sets': sets,
-                'reps': reps,
+        workout = [
+            {
+                'exercise': str(exercise),
+                'sets': int(n_sets),
+                'reps': int(n_reps),
                 'rest': '30-60 seconds'
-            })
+            }
+            for exercise, n_sets, n_reps in zip(selected_exercises, sets, reps)
+        ]
         
         return workout
     
-    def _fallback_recommendation(self, user_profile):
+    def _fallback_recommendation(self, user_profile, goal=None):
         """Fallback recommendation when ML model fails"""
-        goal = user_profile.get('goal', 'general_fitness')
+        goal = goal or user_profile.get('goal', 'general_fitness')
         experience = user_profile.get('experience', 'beginner')
         
         # Simple rule-based recommendations
@@ -1,14 +1,14 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import json
 import os
-from datetime import datetime, date
-import random
-import plotly.express as px
-import plotly.graph_objects as go
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 import streamlit.components.v1 as components
 
+# Plotly is imported where it is used so pages without charts don't pay for it
+
 # Page configuration
 st.set_page_config(
     page_title="AI Fitness Coach",
@@ -17,56 +17,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Dark theme CSS
+# Colors come from the dark theme in .streamlit/config.toml; only styles the
+# theme can't express are injected here
 st.markdown("""
 <style>
-    .stApp {
-        background-color: #0E1117;
-        color: #FAFAFA;
-    }
-    
-    .stSidebar {
-        background-color: #262730;
-    }
-    
-    .stSelectbox > div > div {
-        background-color: #262730;
-        color: #FAFAFA;
-    }
-    
-    .stNumberInput > div > div > input {
-        background-color: #262730;
-        color: #FAFAFA;
-        border: 1px solid #4F4F4F;
-    }
-    
-    .stTextInput > div > div > input {
-        background-color: #262730;
-        color: #FAFAFA;
-        border: 1px solid #4F4F4F;
-    }
-    
-    .stSlider > div > div > div {
-        color: #FAFAFA;
-    }
-    
-    .metric-container {
-        background: linear-gradient(135deg, #1E2139 0%, #262730 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        border: 1px solid #4F4F4F;
-        margin: 0.5rem 0;
-    }
-    
-    .workout-card {
-        background: linear-gradient(135deg, #2D3748 0%, #1A202C 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border: 1px solid #4F4F4F;
-        margin: 1rem 0;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-    }
-    
     .stButton > button {
         background: linear-gradient(45deg, #667eea 0%, #764ba2 100%);
         color: white;
@@ -82,14 +36,6 @@ st.markdown("""
         box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
     }
     
-    .success {
-        background: linear-gradient(45deg, #48bb78 0%, #38a169 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        color: white;
-        margin: 1rem 0;
-    }
-    
     .warning {
         background: linear-gradient(45deg, #ed8936 0%, #dd6b20 100%);
         padding: 1rem;
@@ -97,43 +43,150 @@ st.markdown("""
         color: white;
         margin: 1rem 0;
     }
-    
-    .pose-detection-area {
-        background: linear-gradient(135deg, #1A202C 0%, #2D3748 100%);
-        padding: 2rem;
-        border-radius: 20px;
-        border: 2px solid #4F4F4F;
-        text-align: center;
-        margin: 1rem 0;
-        min-height: 400px;
-    }
-    
-    .camera-placeholder {
-        background: #262730;
-        border: 2px dashed #667eea;
-        border-radius: 15px;
-        padding: 3rem;
-        margin: 2rem 0;
-        color: #FAFAFA;
-    }
 </style>
 """, unsafe_allow_html=True)
 
+# Selectbox options and their index lookups
+_GENDER_OPTS = ("Male", "Female", "Other")
+_GENDER_IDX = {v: i for i, v in enumerate(_GENDER_OPTS)}
+_GOAL_OPTS = ("Weight Loss", "Muscle Gain", "Endurance", "Strength", "General Fitness")
+_GOAL_IDX = {v: i for i, v in enumerate(_GOAL_OPTS)}
+_EXPERIENCE_OPTS = ("Beginner", "Intermediate", "Advanced")
+_EXPERIENCE_IDX = {v: i for i, v in enumerate(_EXPERIENCE_OPTS)}
+
+# Workout plan exercises per intensity level
+_EXERCISES_BY_LEVEL = MappingProxyType({
+    'beginner': (
+        {'exercise': 'Push-ups', 'sets': 2, 'reps': 8, 'rest': '30 seconds'},
+        {'exercise': 'Squats', 'sets': 2, 'reps': 10, 'rest': '30 seconds'},
+        {'exercise': 'Plank', 'sets': 2, 'reps': '20 seconds', 'rest': '30 seconds'},
+        {'exercise': 'Jumping Jacks', 'sets': 2, 'reps': 15, 'rest': '30 seconds'}
+    ),
+    'intermediate': (
+        {'exercise': 'Push-ups', 'sets': 3, 'reps': 12, 'rest': '45 seconds'},
+        {'exercise': 'Squats', 'sets': 3, 'reps': 15, 'rest': '45 seconds'},
+        {'exercise': 'Lunges', 'sets': 3, 'reps': 10, 'rest': '45 seconds'},
+        {'exercise': 'Plank', 'sets': 3, 'reps': '30 seconds', 'rest': '45 seconds'},
+        {'exercise': 'Mountain Climbers', 'sets': 3, 'reps': 20, 'rest': '45 seconds'}
+    ),
+    'advanced': (
+        {'exercise': 'Push-ups', 'sets': 4, 'reps': 15, 'rest': '60 seconds'},
+        {'exercise': 'Squats', 'sets': 4, 'reps': 20, 'rest': '60 seconds'},
+        {'exercise': 'Burpees', 'sets': 3, 'reps': 10, 'rest': '60 seconds'},
+        {'exercise': 'Plank', 'sets': 3, 'reps': '45 seconds', 'rest': '60 seconds'},
+        {'exercise': 'Mountain Climbers', 'sets': 4, 'reps': 25, 'rest': '60 seconds'},
+        {'exercise': 'Jump Squats', 'sets': 3, 'reps': 15, 'rest': '60 seconds'}
+    )
+})
+
+# Display names for the body types
+_BODY_TYPE_TITLES = MappingProxyType({
+    'ectomorph': 'Ectomorph',
+    'mesomorph': 'Mesomorph',
+    'endomorph': 'Endomorph'
+})
+
+# Body type descriptions and tips for the BMI page
+_BODY_TYPE_INFO = MappingProxyType({
+    'ectomorph': {
+        'description': 'Naturally lean with fast metabolism',
+        'tips': ('Focus on compound movements', 'Eat frequently', 'Limit excessive cardio')
+    },
+    'mesomorph': {
+        'description': 'Naturally athletic with balanced metabolism', 
+        'tips': ('Balanced training approach', 'Mix cardio and strength', 'Progressive overload')
+    },
+    'endomorph': {
+        'description': 'Naturally rounder build with slower metabolism',
+        'tips': ('Include more cardio', 'High-intensity training', 'Control portions')
+    }
+})
+
+# Exercise library shown on the pose detection page
+_EXERCISE_LIBRARY = MappingProxyType({
+    "Push-ups": {
+        "difficulty": "Beginner to Advanced",
+        "calories_per_rep": 0.5,
+        "primary_muscles": "Chest, Triceps, Shoulders",
+        "tips": (
+            "Keep your body in a straight line",
+            "Lower chest to ground level",
+            "Don't let hips sag or pike up",
+            "Control both up and down movement"
+        )
+    },
+    "Squats": {
+        "difficulty": "Beginner to Advanced", 
+        "calories_per_rep": 0.8,
+        "primary_muscles": "Quadriceps, Glutes, Hamstrings",
+        "tips": (
+            "Feet shoulder-width apart",
+            "Chest up, core engaged",
+            "Lower until thighs parallel to ground",
+            "Drive through heels to stand"
+        )
+    },
+    "Lunges": {
+        "difficulty": "Beginner to Intermediate",
+        "calories_per_rep": 0.7,
+        "primary_muscles": "Quadriceps, Glutes, Calves",
+        "tips": (
+            "Step forward into lunge position",
+            "90-degree angles at both knees",
+            "Keep front knee over ankle",
+            "Drive through front heel to return"
+        )
+    },
+    "Plank": {
+        "difficulty": "Beginner to Advanced",
+        "calories_per_sec": 0.05,
+        "primary_muscles": "Core, Shoulders, Back",
+        "tips": (
+            "Body in straight line from head to heels",
+            "Engage core and glutes",
+            "Don't hold your breath",
+            "Keep shoulders over elbows"
+        )
+    }
+})
+
+@st.cache_data(show_spinner=False)
+def _read_html(path, mtime):
+    """Read an HTML file; mtime is part of the cache key so edits are picked up"""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+# Number of full workout records kept in session_state.workout_history
+WORKOUT_HISTORY_MAXLEN = 64
+
 # Initialize session state
 def init_session_state():
     if 'user_profile' not in st.session_state:
         st.session_state.user_profile = {}
     if 'workout_history' not in st.session_state:
-        st.session_state.workout_history = []
+        # Only recent workouts are kept as full records; the running totals
+        # below, kept by record_completed_workout(), cover every workout
+        st.session_state.workout_history = deque(maxlen=WORKOUT_HISTORY_MAXLEN)
+        st.session_state.workout_count = 0
+        st.session_state.total_calories = 0
     if 'current_workout' not in st.session_state:
         st.session_state.current_workout = None
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = "Dashboard"
     if 'pose_active' not in st.session_state:
         st.session_state.pose_active = False
     if 'exercise_reps' not in st.session_state:
         st.session_state.exercise_reps = 0
 
+def record_completed_workout(workout):
+    """Add a finished workout to the history and update the running totals"""
+    # The workout is annotated in place; current_workout is cleared below so
+    # nothing else holds on to it
+    workout['date'] = datetime.now().isoformat()
+    workout['completed'] = True
+    st.session_state.workout_history.append(workout)
+    st.session_state.workout_count += 1
+    st.session_state.total_calories += workout['estimated_calories']
+    st.session_state.current_workout = None
+
 def calculate_bmi(weight_kg, height_cm):
     """Calculate BMI"""
     return weight_kg / ((height_cm / 100) ** 2)
@@ -161,6 +214,7 @@ def classify_body_type(height, weight, age, gender):
         body_type = 'mesomorph'
     
     return {
+        'bmi': bmi,
         'body_type': body_type,
         'confidence': 0.85,
         'probabilities': {
@@ -170,45 +224,33 @@ def classify_body_type(height, weight, age, gender):
         }
     }
 
+# Body types indexed by classify_body_types() codes
+_BODY_TYPES = np.array(['ectomorph', 'mesomorph', 'endomorph'])
+
+def classify_body_types(heights, weights):
+    """Classify arrays of heights (cm) and weights (kg) with the same BMI rules"""
+    bmi = calculate_bmi(np.asarray(weights, dtype=float), np.asarray(heights, dtype=float))
+    return _BODY_TYPES[np.add(bmi >= 20, bmi > 27, dtype=int)]
+
+@lru_cache(maxsize=None)
+def _plan_template(level, duration):
+    """Get the plan fields fixed by intensity level and duration"""
+    # The exercises tuple is shared read-only by every plan built from it
+    exercises = _EXERCISES_BY_LEVEL.get(level, _EXERCISES_BY_LEVEL['beginner'])
+    return MappingProxyType({
+        'duration': duration,
+        'focus': 'Full Body',
+        'exercises': exercises,
+        'estimated_calories': len(exercises) * 5 * (duration // 30)
+    })
+
 def generate_workout_plan(user_profile, workout_type="AI Recommended", duration=45, intensity="Beginner"):
     """Generate a simple workout plan"""
-    
-    # Exercise database
-    exercises = {
-        'beginner': [
-            {'exercise': 'Push-ups', 'sets': 2, 'reps': 8, 'rest': '30 seconds'},
-            {'exercise': 'Squats', 'sets': 2, 'reps': 10, 'rest': '30 seconds'},
-            {'exercise': 'Plank', 'sets': 2, 'reps': '20 seconds', 'rest': '30 seconds'},
-            {'exercise': 'Jumping Jacks', 'sets': 2, 'reps': 15, 'rest': '30 seconds'}
-        ],
-        'intermediate': [
-            {'exercise': 'Push-ups', 'sets': 3, 'reps': 12, 'rest': '45 seconds'},
-            {'exercise': 'Squats', 'sets': 3, 'reps': 15, 'rest': '45 seconds'},
-            {'exercise': 'Lunges', 'sets': 3, 'reps': 10, 'rest': '45 seconds'},
-            {'exercise': 'Plank', 'sets': 3, 'reps': '30 seconds', 'rest': '45 seconds'},
-            {'exercise': 'Mountain Climbers', 'sets': 3, 'reps': 20, 'rest': '45 seconds'}
-        ],
-        'advanced': [
-            {'exercise': 'Push-ups', 'sets': 4, 'reps': 15, 'rest': '60 seconds'},
-            {'exercise': 'Squats', 'sets': 4, 'reps': 20, 'rest': '60 seconds'},
-            {'exercise': 'Burpees', 'sets': 3, 'reps': 10, 'rest': '60 seconds'},
-            {'exercise': 'Plank', 'sets': 3, 'reps': '45 seconds', 'rest': '60 seconds'},
-            {'exercise': 'Mountain Climbers', 'sets': 4, 'reps': 25, 'rest': '60 seconds'},
-            {'exercise': 'Jump Squats', 'sets': 3, 'reps': 15, 'rest': '60 seconds'}
-        ]
-    }
-    
-    selected_exercises = exercises.get(intensity.lower(), exercises['beginner'])
-    estimated_calories = len(selected_exercises) * 5 * (duration // 30)
-    
     return {
+        **_plan_template(intensity.lower(), duration),
         'type': workout_type,
-        'duration': duration,
         'intensity': intensity,
         'goal': user_profile.get('goal', 'General Fitness'),
-        'focus': 'Full Body',
-        'exercises': selected_exercises,
-        'estimated_calories': estimated_calories,
         'generated_at': datetime.now().isoformat()
     }
 
@@ -218,16 +260,42 @@ def render_dashboard():
     
     if not st.session_state.user_profile:
         st.markdown('<div class="warning">⚠️ Please complete your profile first!</div>', unsafe_allow_html=True)
-        if st.button("Go to Profile", key="dashboard_profile_btn"):
-            st.session_state.current_page = "Profile"
-            st.rerun()
+        st.page_link(_PROFILE_PAGE, label="Go to Profile")
         return
     
     # Dashboard metrics
+    render_dashboard_metrics()
+    
+    # Current workout section
+    st.subheader("📅 Today's Workout")
+    
+    if st.session_state.current_workout:
+        # Plans always come from generate_workout_plan(), so every key is set
+        workout = st.session_state.current_workout
+        st.success("✅ Workout Plan Ready!")
+        
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.write(f"**Type:** {workout['type']}")
+            st.write(f"**Duration:** {workout['duration']} minutes")
+        with col_b:
+            st.write(f"**Exercises:** {len(workout['exercises'])}")
+            st.write(f"**Estimated Calories:** {workout['estimated_calories']}")
+        
+        if st.button("✅ Mark Complete"):
+            record_completed_workout(workout)
+            st.success("🎉 Workout completed! Great job!")
+            st.balloons()
+            st.rerun()
+    else:
+        st.info("🎯 No workout planned for today")
+        st.page_link(_WORKOUT_PLANNER_PAGE, label="Generate Workout Plan")
+
+def render_dashboard_metrics():
+    """Render key metrics at the top of the dashboard"""
     col1, col2, col3, col4 = st.columns(4)
     
     profile = st.session_state.user_profile
-    history = st.session_state.workout_history
     
     with col1:
         st.metric(
@@ -237,54 +305,46 @@ def render_dashboard():
         )
     
     with col2:
-        workouts_completed = len(history)
         st.metric(
             label="Workouts Completed",
-            value=workouts_completed
+            value=st.session_state.workout_count
         )
     
     with col3:
-        total_calories = sum(w.get('estimated_calories', 0) for w in history)
         st.metric(
             label="Calories Burned",
-            value=f"{total_calories:,}"
+            value=f"{st.session_state.total_calories:,}"
         )
     
     with col4:
         st.metric(
             label="Body Type",
-            value=profile.get('body_type', 'Not determined').title()
+            value=_BODY_TYPE_TITLES.get(profile.get('body_type'), 'Not Determined')
         )
-    
-    # Current workout section
-    st.subheader("📅 Today's Workout")
-    
-    if st.session_state.current_workout:
-        workout = st.session_state.current_workout
-        st.success("✅ Workout Plan Ready!")
-        
-        col_a, col_b = st.columns(2)
-        with col_a:
-            st.write(f"**Type:** {workout.get('type', 'General')}")
-            st.write(f"**Duration:** {workout.get('duration', 30)} minutes")
-        with col_b:
-            st.write(f"**Exercises:** {len(workout.get('exercises', []))}")
-            st.write(f"**Estimated Calories:** {workout.get('estimated_calories', 0)}")
-        
-        if st.button("✅ Mark Complete"):
-            workout_data = workout.copy()
-            workout_data['date'] = datetime.now().isoformat()
-            workout_data['completed'] = True
-            st.session_state.workout_history.append(workout_data)
-            st.session_state.current_workout = None
-            st.success("🎉 Workout completed! Great job!")
-            st.balloons()
-            st.rerun()
-    else:
-        st.info("🎯 No workout planned for today")
-        if st.button("Generate Workout Plan", type="primary", key="dashboard_workout_btn"):
-            st.session_state.current_page = "Workout Planner"
-            st.rerun()
+
+@st.cache_data(show_spinner=False)
+def _build_bmi_gauge(bmi_rounded):
+    """Build the BMI gauge figure as a plain dict so it can be cached"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=bmi_rounded,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "BMI Scale"},
+        gauge={
+            'axis': {'range': [None, 40]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 18.5], 'color': "lightblue"},
+                {'range': [18.5, 25], 'color': "lightgreen"},
+                {'range': [25, 30], 'color': "yellow"},
+                {'range': [30, 40], 'color': "red"}
+            ]
+        }
+    ))
+    fig.update_layout(height=300)
+    return fig.to_dict()
 
 def render_bmi_calculator():
     """Render BMI calculator"""
@@ -295,14 +355,18 @@ def render_bmi_calculator():
     with col1:
         st.subheader("📏 Calculate Your BMI")
         
-        height_cm = st.number_input("Height (cm)", min_value=100.0, max_value=250.0, value=170.0, step=0.5)
-        weight_kg = st.number_input("Weight (kg)", min_value=30.0, max_value=300.0, value=70.0, step=0.1)
-        age = st.number_input("Age", min_value=13, max_value=100, value=30)
-        gender = st.selectbox("Gender", ["Male", "Female", "Other"])
+        # Inputs are batched in a form so editing them doesn't rerun the app
+        with st.form("bmi_form"):
+            height_cm = st.number_input("Height (cm)", min_value=100.0, max_value=250.0, value=170.0, step=0.5)
+            weight_kg = st.number_input("Weight (kg)", min_value=30.0, max_value=300.0, value=70.0, step=0.1)
+            age = st.number_input("Age", min_value=13, max_value=100, value=30)
+            gender = st.selectbox("Gender", _GENDER_OPTS)
+            submitted = st.form_submit_button("Calculate BMI & Analyze Body Type", type="primary")
         
-        if st.button("Calculate BMI & Analyze Body Type", type="primary"):
-            bmi = calculate_bmi(weight_kg, height_cm)
+        if submitted:
+            # The classifier already computes the BMI; reuse it
             body_type_result = classify_body_type(height_cm, weight_kg, age, gender)
+            bmi = body_type_result['bmi']
             
             st.session_state.user_profile.update({
                 'height': height_cm,
@@ -327,55 +391,24 @@ def render_bmi_calculator():
             
             st.metric(label="Your BMI", value=f"{bmi:.1f}", delta=category)
             
-            # BMI gauge chart
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=bmi,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "BMI Scale"},
-                gauge={
-                    'axis': {'range': [None, 40]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 18.5], 'color': "lightblue"},
-                        {'range': [18.5, 25], 'color': "lightgreen"},
-                        {'range': [25, 30], 'color': "yellow"},
-                        {'range': [30, 40], 'color': "red"}
-                    ]
-                }
-            ))
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            # BMI gauge chart; round before keying the cache so nearby values
+            # share one figure
+            st.plotly_chart(_build_bmi_gauge(round(bmi, 1)), use_container_width=True)
             
             # Body type display
             if 'body_type' in profile:
                 st.subheader("🧬 Body Type Analysis")
                 body_type = profile['body_type']
-                confidence = profile.get('body_type_confidence', 0)
+                confidence = profile['body_type_confidence']
                 
                 st.metric(
                     label="Primary Body Type",
-                    value=body_type.title(),
+                    value=_BODY_TYPE_TITLES.get(body_type) or body_type.title(),
                     delta=f"{confidence:.1%} confidence"
                 )
                 
                 # Body type info
-                body_type_info = {
-                    'ectomorph': {
-                        'description': 'Naturally lean with fast metabolism',
-                        'tips': ['Focus on compound movements', 'Eat frequently', 'Limit excessive cardio']
-                    },
-                    'mesomorph': {
-                        'description': 'Naturally athletic with balanced metabolism', 
-                        'tips': ['Balanced training approach', 'Mix cardio and strength', 'Progressive overload']
-                    },
-                    'endomorph': {
-                        'description': 'Naturally rounder build with slower metabolism',
-                        'tips': ['Include more cardio', 'High-intensity training', 'Control portions']
-                    }
-                }
-                
-                info = body_type_info.get(body_type, body_type_info['mesomorph'])
+                info = _BODY_TYPE_INFO.get(body_type, _BODY_TYPE_INFO['mesomorph'])
                 st.write(f"**Description:** {info['description']}")
                 st.write("**Tips:**")
                 for tip in info['tips']:
@@ -389,9 +422,7 @@ def render_workout_planner():
     
     if not st.session_state.user_profile or 'bmi' not in st.session_state.user_profile:
         st.markdown('<div class="warning">⚠️ Please calculate your BMI first!</div>', unsafe_allow_html=True)
-        if st.button("Go to BMI Calculator", key="planner_bmi_btn"):
-            st.session_state.current_page = "BMI Calculator"
-            st.rerun()
+        st.page_link(_BMI_CALCULATOR_PAGE, label="Go to BMI Calculator")
         return
     
     col1, col2 = st.columns([1, 2])
@@ -399,11 +430,15 @@ def render_workout_planner():
     with col1:
         st.subheader("🎯 Workout Preferences")
         
-        workout_type = st.selectbox("Workout Focus", ["AI Recommended", "Strength Training", "Cardio", "HIIT", "Full Body"])
-        duration = st.slider("Workout Duration (minutes)", min_value=15, max_value=90, value=45, step=5)
-        intensity = st.selectbox("Intensity Level", ["Beginner", "Intermediate", "Advanced"])
+        # Preferences are batched in a form so dragging the slider doesn't
+        # rerun the app
+        with st.form("workout_prefs"):
+            workout_type = st.selectbox("Workout Focus", ["AI Recommended", "Strength Training", "Cardio", "HIIT", "Full Body"])
+            duration = st.slider("Workout Duration (minutes)", min_value=15, max_value=90, value=45, step=5)
+            intensity = st.selectbox("Intensity Level", ["Beginner", "Intermediate", "Advanced"])
+            submitted = st.form_submit_button("🔥 Generate AI Workout", type="primary")
         
-        if st.button("🔥 Generate AI Workout", type="primary"):
+        if submitted:
             workout_plan = generate_workout_plan(
                 st.session_state.user_profile, 
                 workout_type, 
@@ -432,21 +467,16 @@ def render_workout_planner():
             
             st.subheader("📋 Exercise Plan")
             
-            for i, exercise in enumerate(workout['exercises'], 1):
-                with st.expander(f"Exercise {i}: {exercise['exercise']}", expanded=True):
-                    col_x, col_y = st.columns(2)
-                    with col_x:
-                        st.write(f"**Sets:** {exercise['sets']}")
-                        st.write(f"**Reps:** {exercise['reps']}")
-                    with col_y:
-                        st.write(f"**Rest:** {exercise['rest']}")
+            # One table rather than an expander, columns and writes per exercise;
+            # reps mix counts and durations, so everything is shown as text
+            import pandas as pd
+            plan_df = pd.DataFrame(workout['exercises'], columns=['exercise', 'sets', 'reps', 'rest']).astype(str)
+            plan_df.columns = ['Exercise', 'Sets', 'Reps', 'Rest']
+            plan_df.index = range(1, len(plan_df) + 1)
+            st.dataframe(plan_df, use_container_width=True)
             
             if st.button("✅ Mark Workout Complete", type="primary"):
-                workout_data = workout.copy()
-                workout_data['date'] = datetime.now().isoformat()
-                workout_data['completed'] = True
-                st.session_state.workout_history.append(workout_data)
-                st.session_state.current_workout = None
+                record_completed_workout(workout)
                 st.success("🎉 Workout completed and added to history!")
                 st.balloons()
                 st.rerun()
@@ -474,13 +504,11 @@ def render_pose_detector():
     </div>
     """, unsafe_allow_html=True)
     
-    # Load the HTML camera component
-    # FIX: Adding encoding='utf-8' to prevent UnicodeDecodeError
-    with open('pose_camera.html', 'r', encoding='utf-8') as f:
-        camera_html = f.read()
-    
-    # Embed the full HTML camera component
-    components.html(camera_html, height=800, scrolling=True)
+    # The history button reruns on its own, so pressing it doesn't repaint
+    # the camera iframe. On full app reruns the iframe is only kept mounted
+    # while its position and arguments stay the same, so keep everything
+    # above it unconditional
+    _camera_panel()
     
     # Additional features below the camera
     st.markdown("---")
@@ -488,78 +516,10 @@ def render_pose_detector():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("📊 Workout History")
-        if 'pose_sessions' in st.session_state and st.session_state.pose_sessions:
-            for i, session in enumerate(st.session_state.pose_sessions[-5:], 1):  # Show last 5 sessions
-                with st.expander(f"Session {i}: {session['exercise']}", expanded=False):
-                    st.write(f"**Reps:** {session['reps_completed']}/{session['target_reps']}")
-                    st.write(f"**Form Score:** {session['form_score']}%")
-                    st.write(f"**Date:** {session['date'][:16]}")
-                    st.write(f"**Calories:** {session['calories']}")
-        else:
-            st.info("No workout sessions recorded yet. Start a detection session to track your progress!")
+        _history_panel()
     
     with col2:
-        st.subheader("🏆 Exercise Library")
-        
-        exercises_library = {
-            "Push-ups": {
-                "difficulty": "Beginner to Advanced",
-                "calories_per_rep": 0.5,
-                "primary_muscles": "Chest, Triceps, Shoulders",
-                "tips": [
-                    "Keep your body in a straight line",
-                    "Lower chest to ground level",
-                    "Don't let hips sag or pike up",
-                    "Control both up and down movement"
-                ]
-            },
-            "Squats": {
-                "difficulty": "Beginner to Advanced", 
-                "calories_per_rep": 0.8,
-                "primary_muscles": "Quadriceps, Glutes, Hamstrings",
-                "tips": [
-                    "Feet shoulder-width apart",
-                    "Chest up, core engaged",
-                    "Lower until thighs parallel to ground",
-                    "Drive through heels to stand"
-                ]
-            },
-            "Lunges": {
-                "difficulty": "Beginner to Intermediate",
-                "calories_per_rep": 0.7,
-                "primary_muscles": "Quadriceps, Glutes, Calves",
-                "tips": [
-                    "Step forward into lunge position",
-                    "90-degree angles at both knees",
-                    "Keep front knee over ankle",
-                    "Drive through front heel to return"
-                ]
-            },
-            "Plank": {
-                "difficulty": "Beginner to Advanced",
-                "calories_per_sec": 0.05,
-                "primary_muscles": "Core, Shoulders, Back",
-                "tips": [
-                    "Body in straight line from head to heels",
-                    "Engage core and glutes",
-                    "Don't hold your breath",
-                    "Keep shoulders over elbows"
-                ]
-            }
-        }
-        
-        for exercise_name, details in exercises_library.items():
-            with st.expander(f"💪 {exercise_name}", expanded=False):
-                st.write(f"**Difficulty:** {details['difficulty']}")
-                st.write(f"**Primary Muscles:** {details['primary_muscles']}")
-                if 'calories_per_rep' in details:
-                    st.write(f"**Calories per Rep:** ~{details['calories_per_rep']}")
-                else:
-                    st.write(f"**Calories per Second:** ~{details['calories_per_sec']}")
-                st.write("**Form Tips:**")
-                for tip in details['tips']:
-                    st.write(f"• {tip}")
+        _library_panel()
     
     # Troubleshooting section
     st.markdown("---")
@@ -589,6 +549,48 @@ def render_pose_detector():
         4. **Update Browser**: Ensure you have the latest browser version
         """)
     
+    _add_to_history_panel()
+
+def _camera_panel():
+    """Render the embedded camera component"""
+    # Load the HTML camera component (read from disk once, not every rerun)
+    camera_html = _read_html('pose_camera.html', os.path.getmtime('pose_camera.html'))
+    
+    # Embed the full HTML camera component
+    components.html(camera_html, height=800, scrolling=True)
+
+def _history_panel():
+    """Render the recent pose detection sessions"""
+    st.subheader("📊 Workout History")
+    if 'pose_sessions' in st.session_state and st.session_state.pose_sessions:
+        for i, session in enumerate(st.session_state.pose_sessions[-5:], 1):  # Show last 5 sessions
+            with st.expander(f"Session {i}: {session['exercise']}", expanded=False):
+                st.write(f"**Reps:** {session['reps_completed']}/{session['target_reps']}")
+                st.write(f"**Form Score:** {session['form_score']}%")
+                st.write(f"**Date:** {session['date'][:16]}")
+                st.write(f"**Calories:** {session['calories']}")
+    else:
+        st.info("No workout sessions recorded yet. Start a detection session to track your progress!")
+
+def _library_panel():
+    """Render the exercise library"""
+    st.subheader("🏆 Exercise Library")
+    
+    for exercise_name, details in _EXERCISE_LIBRARY.items():
+        with st.expander(f"💪 {exercise_name}", expanded=False):
+            st.write(f"**Difficulty:** {details['difficulty']}")
+            st.write(f"**Primary Muscles:** {details['primary_muscles']}")
+            if 'calories_per_rep' in details:
+                st.write(f"**Calories per Rep:** ~{details['calories_per_rep']}")
+            else:
+                st.write(f"**Calories per Second:** ~{details['calories_per_sec']}")
+            st.write("**Form Tips:**")
+            for tip in details['tips']:
+                st.write(f"• {tip}")
+
+@st.fragment
+def _add_to_history_panel():
+    """Render the add-to-history button"""
     # Save pose session data to workout history
     if st.button("📈 Add to Workout History", key="add_to_history"):
         # This would integrate with the main workout tracking system
@@ -599,39 +601,36 @@ def render_profile():
     """Render user profile page"""
     st.title("👤 User Profile")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Personal Information")
-        name = st.text_input("Name", value=st.session_state.user_profile.get('name', ''))
-        age = st.number_input("Age", min_value=13, max_value=100, 
-                             value=st.session_state.user_profile.get('age', 25))
-        gender = st.selectbox("Gender", ["Male", "Female", "Other"],
-                             index=["Male", "Female", "Other"].index(
-                                 st.session_state.user_profile.get('gender', 'Male')))
+    # Inputs are batched in a form so editing them doesn't rerun the app
+    with st.form("profile_form"):
+        col1, col2 = st.columns(2)
         
-        st.subheader("Fitness Goals")
-        goal = st.selectbox("Primary Goal", 
-                            ["Weight Loss", "Muscle Gain", "Endurance", "Strength", "General Fitness"],
-                            index=0 if 'goal' not in st.session_state.user_profile else
-                            ["Weight Loss", "Muscle Gain", "Endurance", "Strength", "General Fitness"].index(
-                                st.session_state.user_profile.get('goal', 'General Fitness')))
-    
-    with col2:
-        st.subheader("Workout Preferences")
-        workout_duration = st.slider("Preferred workout duration (minutes)", 
-                                     15, 120, st.session_state.user_profile.get('workout_duration', 45))
+        with col1:
+            st.subheader("Personal Information")
+            name = st.text_input("Name", value=st.session_state.user_profile.get('name', ''))
+            age = st.number_input("Age", min_value=13, max_value=100, 
+                                 value=st.session_state.user_profile.get('age', 25))
+            gender = st.selectbox("Gender", _GENDER_OPTS,
+                                 index=_GENDER_IDX.get(st.session_state.user_profile.get('gender'), 0))
+            
+            st.subheader("Fitness Goals")
+            goal = st.selectbox("Primary Goal", _GOAL_OPTS,
+                                index=_GOAL_IDX.get(st.session_state.user_profile.get('goal'), 0))
         
-        workout_frequency = st.slider("Workouts per week", 
-                                     1, 7, st.session_state.user_profile.get('workout_frequency', 3))
+        with col2:
+            st.subheader("Workout Preferences")
+            workout_duration = st.slider("Preferred workout duration (minutes)", 
+                                         15, 120, st.session_state.user_profile.get('workout_duration', 45))
+            
+            workout_frequency = st.slider("Workouts per week", 
+                                         1, 7, st.session_state.user_profile.get('workout_frequency', 3))
+            
+            experience = st.selectbox("Fitness Experience", _EXPERIENCE_OPTS,
+                                     index=_EXPERIENCE_IDX.get(st.session_state.user_profile.get('experience'), 0))
         
-        experience = st.selectbox("Fitness Experience",
-                                 ["Beginner", "Intermediate", "Advanced"],
-                                 index=0 if 'experience' not in st.session_state.user_profile else
-                                 ["Beginner", "Intermediate", "Advanced"].index(
-                                     st.session_state.user_profile.get('experience', 'Beginner')))
+        submitted = st.form_submit_button("Save Profile", type="primary")
     
-    if st.button("Save Profile", type="primary"):
+    if submitted:
         st.session_state.user_profile.update({
             'name': name,
             'age': age,
@@ -644,61 +643,57 @@ def render_profile():
         st.success("Profile saved successfully!")
         st.rerun()
 
+def render_sidebar_profile():
+    """Render the profile summary and quick stats in the sidebar"""
+    st.markdown("---")
+    st.subheader("Your Profile")
+    profile = st.session_state.user_profile
+    st.markdown(_profile_summary(
+        profile.get('bmi'), profile.get('body_type'), profile.get('goal'),
+        st.session_state.workout_count, st.session_state.total_calories
+    ))
+
+@lru_cache(maxsize=256)
+def _profile_summary(bmi, body_type, goal, workout_count, total_calories):
+    """Format the sidebar profile summary as one markdown string"""
+    lines = []
+    if bmi is not None:
+        lines.append(f"**BMI:** {bmi:.1f}")
+    if body_type is not None:
+        lines.append(f"**Body Type:** {_BODY_TYPE_TITLES.get(body_type) or body_type.title()}")
+    if goal is not None:
+        lines.append(f"**Goal:** {goal}")
+    
+    # Quick stats
+    if workout_count:
+        lines.append(f"**Workouts:** {workout_count}")
+        lines.append(f"**Calories Burned:** {total_calories:,}")
+    return "\n\n".join(lines)
+
+# Native multipage navigation; only the selected page's function runs, and
+# page links switch pages without a separate rerun
+_DASHBOARD_PAGE = st.Page(render_dashboard, title="Dashboard", icon="🏋️", url_path="dashboard", default=True)
+_BMI_CALCULATOR_PAGE = st.Page(render_bmi_calculator, title="BMI Calculator", icon="📊", url_path="bmi-calculator")
+_WORKOUT_PLANNER_PAGE = st.Page(render_workout_planner, title="Workout Planner", icon="🔥", url_path="workout-planner")
+_POSE_DETECTION_PAGE = st.Page(render_pose_detector, title="Pose Detection", icon="📹", url_path="pose-detection")
+_PROFILE_PAGE = st.Page(render_profile, title="Profile", icon="👤", url_path="profile")
+
 def main():
     init_session_state()
     
     # Sidebar navigation
+    page = st.navigation([
+        _DASHBOARD_PAGE, _BMI_CALCULATOR_PAGE, _WORKOUT_PLANNER_PAGE, _POSE_DETECTION_PAGE, _PROFILE_PAGE
+    ])
     st.sidebar.title("🏋️ AI Fitness Coach")
     
-    # Navigation with session state management
-    pages = ["Dashboard", "BMI Calculator", "Workout Planner", "Pose Detection", "Profile"]
-    
-    # Use selectbox but sync with session state
-    selected_page = st.sidebar.selectbox(
-        "Navigate",
-        pages,
-        index=pages.index(st.session_state.current_page) if st.session_state.current_page in pages else 0,
-        key="nav_selectbox"
-    )
-    
-    # Update session state if page changed via selectbox
-    if selected_page != st.session_state.current_page:
-        st.session_state.current_page = selected_page
-        st.rerun()
-    
     # Display user info in sidebar
     if st.session_state.user_profile:
-        st.sidebar.markdown("---")
-        st.sidebar.subheader("Your Profile")
-        profile = st.session_state.user_profile
-        if 'bmi' in profile:
-            st.sidebar.write(f"**BMI:** {profile['bmi']:.1f}")
-        if 'body_type' in profile:
-            st.sidebar.write(f"**Body Type:** {profile['body_type'].title()}")
-        if 'goal' in profile:
-            st.sidebar.write(f"**Goal:** {profile['goal']}")
-        
-        # Quick stats
-        if st.session_state.workout_history:
-            workouts_count = len(st.session_state.workout_history)
-            total_calories = sum(w.get('estimated_calories', 0) for w in st.session_state.workout_history)
-            st.sidebar.write(f"**Workouts:** {workouts_count}")
-            st.sidebar.write(f"**Calories Burned:** {total_calories:,}")
-    
-    # Current page from session state
-    page = st.session_state.current_page
+        with st.sidebar:
+            render_sidebar_profile()
     
     # Main content area
-    if page == "Dashboard":
-        render_dashboard()
-    elif page == "BMI Calculator":
-        render_bmi_calculator()
-    elif page == "Workout Planner":
-        render_workout_planner()
-    elif page == "Pose Detection":
-        render_pose_detector()
-    elif page == "Profile":
-        render_profile()
+    page.run()
 
 if __name__ == "__main__":
     main()
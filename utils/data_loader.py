@@ -1,18 +1,93 @@
 import pandas as pd
+import numpy as np
 import json
+from itertools import islice
 import os
+import tempfile
 from datetime import datetime
 import streamlit as st
 
-def load_workout_data():
-    """Load workout data from CSV file"""
+# Exercise table: the CSV is the editable source, and a Parquet copy with
+# the column types below is written whenever the CSV is newer, for faster reads
+WORKOUT_DATA_CSV = 'data/workout_data.csv'
+WORKOUT_DATA_PARQUET = 'data/workout_data.parquet'
+_WORKOUT_DATA_DTYPES = {
+    'exercise_id': 'int32',
+    'exercise_name': 'string',
+    'muscle_group': 'category',
+    'difficulty': 'category',
+    'equipment': 'category',
+    'calories_per_minute': 'int16'
+}
+
+# Tables and lookups read from the exercise table, by key, along with the
+# CSV modification time they were read at; shared by every session
+_workout_data_cache = {'mtime': None, 'values': {}}
+
+def _workout_data_cached(key, build):
+    """Get a value built from the exercise table, rebuilt only when the CSV changes"""
+    if not os.path.exists(WORKOUT_DATA_CSV):
+        # Create default workout data
+        create_default_workout_data()
+    
+    mtime = os.stat(WORKOUT_DATA_CSV).st_mtime_ns
+    if _workout_data_cache['mtime'] != mtime:
+        _workout_data_cache['mtime'] = mtime
+        _workout_data_cache['values'] = {}
+    
+    values = _workout_data_cache['values']
+    if key not in values:
+        values[key] = build()
+    return values[key]
+
+def _read_workout_data(columns=None):
+    """Read the exercise table, converting the CSV to Parquet if needed
+    
+    The Parquet copy is only a faster path; if it can't be written or read
+    the table comes from the CSV instead.
+    """
+    columns = list(columns) if columns else None
+    df = None
+    
+    if (not os.path.exists(WORKOUT_DATA_PARQUET)
+            or os.path.getmtime(WORKOUT_DATA_PARQUET) < os.path.getmtime(WORKOUT_DATA_CSV)):
+        df = pd.read_csv(WORKOUT_DATA_CSV, dtype=_WORKOUT_DATA_DTYPES)
+        if not _write_workout_data_parquet(df):
+            return df[columns] if columns else df
+    
     try:
-        if os.path.exists('data/workout_data.csv'):
-            return pd.read_csv('data/workout_data.csv')
-        else:
-            # Create default workout data
-            create_default_workout_data()
-            return pd.read_csv('data/workout_data.csv')
+        return pd.read_parquet(WORKOUT_DATA_PARQUET, columns=columns)
+    except Exception as e:
+        print(f"Error reading {WORKOUT_DATA_PARQUET}, using the CSV: {str(e)}")
+        if df is None:
+            df = pd.read_csv(WORKOUT_DATA_CSV, dtype=_WORKOUT_DATA_DTYPES)
+        return df[columns] if columns else df
+
+def _write_workout_data_parquet(df):
+    """Write the Parquet copy of the exercise table, returning whether it worked"""
+    tmp_path = None
+    try:
+        # Written to a temporary file and moved into place, so other sessions
+        # never read a partly written copy
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(WORKOUT_DATA_PARQUET), suffix='.parquet.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path, compression='zstd', index=False)
+        os.replace(tmp_path, WORKOUT_DATA_PARQUET)
+        return True
+    except Exception as e:
+        print(f"Error writing {WORKOUT_DATA_PARQUET}, using the CSV: {str(e)}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+def load_workout_data(columns=None):
+    """Load workout data, optionally only the given columns, parsed once and cached
+    
+    The returned DataFrame is shared; don't modify it in place.
+    """
+    columns = tuple(columns) if columns else None
+    try:
+        return _workout_data_cached(('table', columns), lambda: _read_workout_data(columns))
     except Exception as e:
         st.error(f"Error loading workout data: {str(e)}")
         return pd.DataFrame()
@@ -85,7 +160,37 @@ def create_default_workout_data():
     
     os.makedirs('data', exist_ok=True)
     df = pd.DataFrame(workout_data)
-    df.to_csv('data/workout_data.csv', index=False)
+    df.to_csv(WORKOUT_DATA_CSV, index=False)
+
+# Columns of the per-session completed-workout DataFrame
+WORKOUT_HISTORY_COLUMNS = ['date', 'duration', 'n_exercises', 'calories', 'goal', 'focus']
+
+def get_workout_history_df():
+    """Get this session's completed workouts as a DataFrame"""
+    if 'workout_history_df' not in st.session_state:
+        st.session_state.workout_history_df = pd.DataFrame(columns=WORKOUT_HISTORY_COLUMNS)
+    return st.session_state.workout_history_df
+
+def recent_workouts(n):
+    """Get the last n completed workouts, oldest first"""
+    history = st.session_state.workout_history
+    return list(islice(history, max(len(history) - n, 0), None))
+
+def append_workout_history(workout_data):
+    """Add a completed workout to the session history list and DataFrame"""
+    st.session_state.workout_history.append(workout_data)
+    
+    row = pd.DataFrame([{
+        'date': pd.to_datetime(workout_data['date'], format='ISO8601'),
+        'duration': workout_data.get('duration', 30),
+        'n_exercises': len(workout_data.get('exercises', [])),
+        'calories': workout_data.get('calories', 0),
+        'goal': workout_data.get('goal'),
+        'focus': workout_data.get('focus')
+    }], columns=WORKOUT_HISTORY_COLUMNS)
+    
+    df = get_workout_history_df()
+    st.session_state.workout_history_df = row if df.empty else pd.concat([df, row], ignore_index=True)
 
 def save_workout_history(user_id, workout_data):
     """Save workout completion to history"""
@@ -138,19 +243,25 @@ def load_workout_history(user_id):
         st.error(f"Error loading workout history: {str(e)}")
         return []
 
-def get_exercise_details(exercise_name):
-    """Get detailed information about a specific exercise"""
+def _exercise_index():
+    """Get each exercise's details keyed by exercise name"""
+    return _workout_data_cached('exercise_index', _build_exercise_index)
+
+def _build_exercise_index():
+    """Build the exercise details lookup from the exercise table"""
     df = load_workout_data()
     
     if df.empty:
-        return None
-    
-    exercise_row = df[df['exercise_name'] == exercise_name]
-    
-    if exercise_row.empty:
-        return None
+        return {}
     
-    return exercise_row.iloc[0].to_dict()
+    # First row wins for duplicated names, as with the old row filter
+    df = df.drop_duplicates('exercise_name')
+    return {row['exercise_name']: row for row in df.to_dict(orient='records')}
+
+def get_exercise_details(exercise_name):
+    """Get detailed information about a specific exercise"""
+    details = _exercise_index().get(exercise_name)
+    return dict(details) if details is not None else None
 
 def filter_exercises(muscle_group=None, difficulty=None, equipment=None):
     """Filter exercises based on criteria"""
@@ -159,33 +270,39 @@ def filter_exercises(muscle_group=None, difficulty=None, equipment=None):
     if df.empty:
         return df
     
-    if muscle_group:
-        df = df[df['muscle_group'] == muscle_group]
+    # Combine the criteria into one mask so the table is sliced once
+    criteria = {'muscle_group': muscle_group, 'difficulty': difficulty, 'equipment': equipment}
+    masks = [(df[column] == value).to_numpy() for column, value in criteria.items() if value]
+    
+    if not masks:
+        return df
     
-    if difficulty:
-        df = df[df['difficulty'] == difficulty]
+    return df[np.logical_and.reduce(masks)]
+
+def _calorie_rates():
+    """Get exercise name to row lookup and calories-per-minute array"""
+    return _workout_data_cached('calorie_rates', _build_calorie_rates)
+
+def _build_calorie_rates():
+    """Build the calorie rate lookup from the exercise table"""
+    df = load_workout_data(columns=['exercise_name', 'calories_per_minute'])
     
-    if equipment:
-        df = df[df['equipment'] == equipment]
+    if df.empty:
+        return {}, np.zeros(0)
     
-    return df
+    df = df.drop_duplicates('exercise_name')
+    exercise_ids = {name: i for i, name in enumerate(df['exercise_name'])}
+    return exercise_ids, df['calories_per_minute'].to_numpy(dtype=float)
 
 def calculate_workout_calories(workout, duration_minutes):
     """Calculate estimated calories burned for a workout"""
-    total_calories = 0
-    df = load_workout_data()
+    exercise_ids, rates = _calorie_rates()
     
-    if df.empty:
+    if not workout or not exercise_ids:
         return 0
     
-    for exercise in workout:
-        exercise_name = exercise.get('exercise', '')
-        exercise_row = df[df['exercise_name'] == exercise_name]
-        
-        if not exercise_row.empty:
-            calories_per_minute = exercise_row.iloc[0]['calories_per_minute']
-            # Estimate time spent on this exercise
-            exercise_time = duration_minutes / len(workout)
-            total_calories += calories_per_minute * exercise_time
-    
-    return int(total_calories)
+    # Each exercise gets an equal share of the duration; unknown ones burn nothing
+    names = [exercise.get('exercise', '') for exercise in workout]
+    ids = [exercise_ids[name] for name in names if name in exercise_ids]
+    exercise_time = duration_minutes / len(workout)
+    return int(rates[ids].sum() * exercise_time)
@@ -0,0 +1,28 @@
+import streamlit as st
+
+# Fitted model weights are persisted in Streamlit's disk cache so restarts
+# skip loading/training. After changing model code or the .pkl files, clear
+# it with `streamlit cache clear` (or "Clear cache" in the app menu).
+@st.cache_data(persist="disk", show_spinner=False)
+def _load_recommender_weights():
+    """Load or train the workout recommender weights"""
+    from models.lstm_recommender import LSTMRecommender
+    return LSTMRecommender().get_weights()
+
+@st.cache_data(persist="disk", show_spinner=False)
+def _load_body_classifier_weights():
+    """Load or train the body type classifier weights"""
+    from models.body_type_classifier import BodyTypeClassifier
+    return BodyTypeClassifier().get_weights()
+
+@st.cache_resource
+def get_lstm_recommender():
+    """Create the workout recommender once per process"""
+    from models.lstm_recommender import LSTMRecommender
+    return LSTMRecommender(weights=_load_recommender_weights())
+
+@st.cache_resource
+def get_body_classifier():
+    """Create the body type classifier once per process"""
+    from models.body_type_classifier import BodyTypeClassifier
+    return BodyTypeClassifier(weights=_load_body_classifier_weights())
@@ -2,12 +2,109 @@ import cv2
 import numpy as np
 import streamlit as st
 import json
+from math import atan2, degrees
+from types import MappingProxyType
+from collections import deque
+from functools import lru_cache
 from datetime import datetime
 
+# PoseNet keypoint names, in the order the model reports them
+_POSENET_NAMES = (
+    'nose', 'leftEye', 'rightEye', 'leftEar', 'rightEar',
+    'leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow',
+    'leftWrist', 'rightWrist', 'leftHip', 'rightHip',
+    'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'
+)
+
+# Row of each keypoint in the per-frame keypoint array
+_POSENET_INDEX = MappingProxyType({name: i for i, name in enumerate(_POSENET_NAMES)})
+
+def _exercise_config(primary_joints, angle_joints, **detection):
+    """Build a read-only exercise config from its joints and thresholds"""
+    # Keypoint rows of each angle triplet, so a frame's angle points are one gather
+    angle_index = np.array(
+        [[_POSENET_INDEX[joint] for joint in points] for _, points in angle_joints],
+        dtype=np.intp
+    )
+    angle_index.flags.writeable = False
+    
+    config = {
+        'primary_joints': primary_joints,
+        'angle_joints': tuple(
+            MappingProxyType({'name': name, 'points': points}) for name, points in angle_joints
+        ),
+        'angle_index': angle_index,
+        # The first angle drives rep counting
+        'primary_angle': angle_joints[0][0]
+    }
+    for kind, thresholds in detection.items():
+        config[kind] = MappingProxyType(thresholds)
+    return MappingProxyType(config)
+
+# Required keypoints, angle triplets and thresholds per exercise
+_EXERCISE_KEYPOINTS = MappingProxyType({
+    'push-ups': _exercise_config(
+        ('leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow', 'leftWrist', 'rightWrist'),
+        (
+            ('left_arm', ('leftShoulder', 'leftElbow', 'leftWrist')),
+            ('right_arm', ('rightShoulder', 'rightElbow', 'rightWrist'))
+        ),
+        rep_detection={
+            'up_angle_min': 160,
+            'down_angle_max': 90
+        }
+    ),
+    'squats': _exercise_config(
+        ('leftHip', 'rightHip', 'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'),
+        (
+            ('left_leg', ('leftHip', 'leftKnee', 'leftAnkle')),
+            ('right_leg', ('rightHip', 'rightKnee', 'rightAnkle'))
+        ),
+        rep_detection={
+            'up_angle_min': 160,
+            'down_angle_max': 90
+        }
+    ),
+    'plank': _exercise_config(
+        ('leftShoulder', 'rightShoulder', 'leftHip', 'rightHip', 'leftAnkle', 'rightAnkle'),
+        (
+            ('body_line', ('leftShoulder', 'leftHip', 'leftAnkle')),
+        ),
+        hold_detection={
+            'target_angle': 180,
+            'tolerance': 20
+        }
+    ),
+    'lunges': _exercise_config(
+        ('leftHip', 'rightHip', 'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'),
+        (
+            ('front_leg', ('leftHip', 'leftKnee', 'leftAnkle')),
+            ('back_leg', ('rightHip', 'rightKnee', 'rightAnkle'))
+        ),
+        rep_detection={
+            'up_angle_min': 160,
+            'down_angle_max': 90
+        }
+    )
+})
+
+@lru_cache(maxsize=256)
+def _exercise_config_key(exercise_name):
+    """Get the _EXERCISE_KEYPOINTS key matching an exercise name"""
+    exercise_key = exercise_name.lower().replace('-', '').replace(' ', '')
+    
+    for key in _EXERCISE_KEYPOINTS:
+        if key in exercise_key or exercise_key in key:
+            return key
+    
+    # Default configuration
+    return 'push-ups'
+
 class PoseDetectionManager:
     def __init__(self):
         self.is_detecting = False
         self.current_exercise = None
+        self.current_config = None
         self.rep_count = 0
         self.last_pose_state = None
         self.confidence_threshold = 0.5
@@ -15,6 +112,8 @@ class PoseDetectionManager:
     def start_detection(self, exercise_name):
         """Start pose detection for a specific exercise"""
         self.current_exercise = exercise_name
+        # Resolve the exercise config once instead of on every frame
+        self.current_config = self.get_exercise_keypoints(exercise_name)
         self.rep_count = 0
         self.last_pose_state = None
         self.is_detecting = True
@@ -23,91 +122,42 @@ class PoseDetectionManager:
         """Stop pose detection"""
         self.is_detecting = False
         self.current_exercise = None
+        self.current_config = None
     
     def get_exercise_keypoints(self, exercise_name):
         """Get required keypoints for each exercise"""
-        exercise_keypoints = {
-            'push-ups': {
-                'primary_joints': ['leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow', 'leftWrist', 'rightWrist'],
-                'angle_joints': [
-                    {'name': 'left_arm', 'points': ['leftShoulder', 'leftElbow', 'leftWrist']},
-                    {'name': 'right_arm', 'points': ['rightShoulder', 'rightElbow', 'rightWrist']}
-                ],
-                'rep_detection': {
-                    'up_angle_min': 160,
-                    'down_angle_max': 90
-                }
-            },
-            'squats': {
-                'primary_joints': ['leftHip', 'rightHip', 'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'],
-                'angle_joints': [
-                    {'name': 'left_leg', 'points': ['leftHip', 'leftKnee', 'leftAnkle']},
-                    {'name': 'right_leg', 'points': ['rightHip', 'rightKnee', 'rightAnkle']}
-                ],
-                'rep_detection': {
-                    'up_angle_min': 160,
-                    'down_angle_max': 90
-                }
-            },
-            'plank': {
-                'primary_joints': ['leftShoulder', 'rightShoulder', 'leftHip', 'rightHip', 'leftAnkle', 'rightAnkle'],
-                'angle_joints': [
-                    {'name': 'body_line', 'points': ['leftShoulder', 'leftHip', 'leftAnkle']}
-                ],
-                'hold_detection': {
-                    'target_angle': 180,
-                    'tolerance': 20
-                }
-            },
-            'lunges': {
-                'primary_joints': ['leftHip', 'rightHip', 'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'],
-                'angle_joints': [
-                    {'name': 'front_leg', 'points': ['leftHip', 'leftKnee', 'leftAnkle']},
-                    {'name': 'back_leg', 'points': ['rightHip', 'rightKnee', 'rightAnkle']}
-                ],
-                'rep_detection': {
-                    'up_angle_min': 160,
-                    'down_angle_max': 90
-                }
-            }
-        }
-        
-        exercise_key = exercise_name.lower().replace('-', '').replace(' ', '')
-        
-        for key, config in exercise_keypoints.items():
-            if key in exercise_key or exercise_key in key:
-                return config
-        
-        # Default configuration
-        return exercise_keypoints['push-ups']
+        return _EXERCISE_KEYPOINTS[_exercise_config_key(exercise_name)]
     
     def calculate_angle(self, point1, point2, point3):
         """Calculate angle between three points"""
         try:
-            # Convert points to numpy arrays
-            a = np.array(point1)
-            b = np.array(point2)
-            c = np.array(point3)
-            
             # Calculate vectors
-            ba = a - b
-            bc = c - b
+            bax, bay = point1[0] - point2[0], point1[1] - point2[1]
+            bcx, bcy = point3[0] - point2[0], point3[1] - point2[1]
             
-            # Calculate angle
-            cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-            angle = np.arccos(np.clip(cosine_angle, -1.0, 1.0))
-            
-            return np.degrees(angle)
+            # Calculate angle from the cross and dot products; plain float
+            # math avoids allocating arrays for two-element vectors
+            return abs(degrees(atan2(bax * bcy - bay * bcx, bax * bcx + bay * bcy)))
         except:
             return 0
     
+    def calculate_angles(self, triplets):
+        """Calculate the angle at the middle point of each (3, 2) point triplet"""
+        pts = np.asarray(triplets, dtype=float)
+        ba = pts[:, 0] - pts[:, 1]
+        bc = pts[:, 2] - pts[:, 1]
+        
+        cross = ba[:, 0] * bc[:, 1] - ba[:, 1] * bc[:, 0]
+        dot = (ba * bc).sum(axis=-1)
+        return np.abs(np.degrees(np.arctan2(cross, dot))).tolist()
+    
     def analyze_pose(self, pose_data):
         """Analyze pose for exercise form and rep counting"""
         if not self.is_detecting or not self.current_exercise:
             return None
         
         try:
-            exercise_config = self.get_exercise_keypoints(self.current_exercise)
+            exercise_config = self.current_config or self.get_exercise_keypoints(self.current_exercise)
             analysis_result = {
                 'exercise': self.current_exercise,
                 'rep_count': self.rep_count,
@@ -116,39 +166,49 @@ class PoseDetectionManager:
                 'confidence': 0
             }
             
-            # Extract keypoints from pose data
-            keypoints = {}
+            # Extract keypoints from pose data as (x, y, confidence) rows in
+            # PoseNet order; only the first n_keypoints rows are reported
+            keypoints = np.zeros((len(_POSENET_NAMES), 3))
+            n_keypoints = 0
             if 'pose' in pose_data and 'keypoints' in pose_data['pose']:
-                for i, kp in enumerate(pose_data['pose']['keypoints']):
-                    if i < len(self.get_posenet_keypoint_names()):
-                        keypoints[self.get_posenet_keypoint_names()[i]] = {
-                            'x': kp['position']['x'],
-                            'y': kp['position']['y'],
-                            'confidence': kp['score']
-                        }
+                rows = [
+                    (kp['position']['x'], kp['position']['y'], kp['score'])
+                    for kp in pose_data['pose']['keypoints'][:len(_POSENET_NAMES)]
+                ]
+                n_keypoints = len(rows)
+                if rows:
+                    keypoints[:n_keypoints] = rows
             
-            # Calculate angles for exercise
-            for angle_config in exercise_config.get('angle_joints', []):
-                angle_name = angle_config['name']
-                joint_names = angle_config['points']
-                
-                if all(joint in keypoints for joint in joint_names):
-                    points = [
-                        [keypoints[joint]['x'], keypoints[joint]['y']]
-                        for joint in joint_names
-                    ]
-                    
-                    if len(points) == 3:
-                        angle = self.calculate_angle(points[0], points[1], points[2])
-                        analysis_result['angles'][angle_name] = angle
+            # Calculate angles for exercise, for every reported joint triplet at once
+            angle_index = exercise_config['angle_index']
+            visible = (angle_index < n_keypoints).all(axis=1)
+            if visible.any():
+                angle_names = [
+                    angle_config['name']
+                    for angle_config, is_visible in zip(exercise_config['angle_joints'], visible)
+                    if is_visible
+                ]
+                angles = self.calculate_angles(keypoints[angle_index[visible], :2])
+                analysis_result['angles'] = dict(zip(angle_names, angles))
             
             # Rep counting logic
             if 'rep_detection' in exercise_config:
                 rep_config = exercise_config['rep_detection']
-                primary_angle = list(analysis_result['angles'].values())[0] if analysis_result['angles'] else 0
+                angles = analysis_result['angles']
                 
-                # Simple rep counting based on angle thresholds
-                current_state = 'up' if primary_angle > rep_config['up_angle_min'] else 'down'
+                # Rep angle, or the first visible angle when it is hidden
+                primary_angle = angles.get(exercise_config['primary_angle'])
+                if primary_angle is None:
+                    primary_angle = next(iter(angles.values()), 0)
+                
+                # Rep counting with hysteresis: between the two thresholds the
+                # state holds, so jitter around one threshold isn't a rep
+                if primary_angle > rep_config['up_angle_min']:
+                    current_state = 'up'
+                elif primary_angle < rep_config['down_angle_max']:
+                    current_state = 'down'
+                else:
+                    current_state = self.last_pose_state
                 
                 if self.last_pose_state == 'down' and current_state == 'up':
                     self.rep_count += 1
@@ -162,8 +222,7 @@ class PoseDetectionManager:
             )
             
             # Calculate overall confidence
-            confidences = [kp['confidence'] for kp in keypoints.values()]
-            analysis_result['confidence'] = np.mean(confidences) if confidences else 0
+            analysis_result['confidence'] = keypoints[:n_keypoints, 2].mean() if n_keypoints else 0
             
             return analysis_result
             
@@ -224,54 +283,74 @@ class PoseDetectionManager:
             return ["📊 Analyzing your form..."]
     
     def get_posenet_keypoint_names(self):
-        """Get list of PoseNet keypoint names in order"""
-        return [
-            'nose', 'leftEye', 'rightEye', 'leftEar', 'rightEar',
-            'leftShoulder', 'rightShoulder', 'leftElbow', 'rightElbow',
-            'leftWrist', 'rightWrist', 'leftHip', 'rightHip',
-            'leftKnee', 'rightKnee', 'leftAnkle', 'rightAnkle'
-        ]
+        """Get list of PoseNet keypoint names in order, matching keypoint array rows"""
+        return list(_POSENET_NAMES)
     
     def save_workout_session(self, exercise_name, duration_seconds, reps_completed):
         """Save completed workout session"""
         try:
+            now = datetime.now()
             session_data = {
                 'exercise': exercise_name,
                 'duration': duration_seconds,
                 'reps': reps_completed,
-                'timestamp': datetime.now().isoformat(),
-                'date': datetime.now().strftime('%Y-%m-%d')
+                'timestamp': now.isoformat(),
+                'date': now.strftime('%Y-%m-%d')
             }
             
             # Save to session state
             if 'pose_sessions' not in st.session_state:
                 st.session_state.pose_sessions = []
             
+            pose_stats = self._pose_stats()
             st.session_state.pose_sessions.append(session_data)
             
+            # Update the running totals
+            pose_stats['total_sessions'] += 1
+            pose_stats['total_reps'] += reps_completed
+            pose_stats['total_duration'] += duration_seconds
+            pose_stats['exercises_performed'].add(exercise_name)
+            pose_stats['session_times'].append(now)
+            
             return True
             
         except Exception as e:
             st.error(f"Error saving workout session: {str(e)}")
             return False
     
+    def _pose_stats(self):
+        """Get this session's running pose workout totals, building them once if missing"""
+        if 'pose_stats' not in st.session_state:
+            sessions = st.session_state.get('pose_sessions', [])
+            st.session_state.pose_stats = {
+                'total_sessions': len(sessions),
+                'total_reps': sum(session['reps'] for session in sessions),
+                'total_duration': sum(session['duration'] for session in sessions),
+                'exercises_performed': set(session['exercise'] for session in sessions),
+                # Save times of sessions that may still count as this week, oldest first
+                'session_times': deque(datetime.fromisoformat(session['timestamp']) for session in sessions)
+            }
+        return st.session_state.pose_stats
+    
     def get_workout_stats(self):
         """Get workout statistics from saved sessions"""
-        if 'pose_sessions' not in st.session_state:
+        if not st.session_state.get('pose_sessions'):
             return {}
         
-        sessions = st.session_state.pose_sessions
+        pose_stats = self._pose_stats()
         
-        if not sessions:
-            return {}
+        # Drop sessions that have aged out of the last week
+        session_times = pose_stats['session_times']
+        now = datetime.now()
+        while session_times and (now - session_times[0]).days > 7:
+            session_times.popleft()
         
         stats = {
-            'total_sessions': len(sessions),
-            'total_reps': sum(session['reps'] for session in sessions),
-            'total_duration': sum(session['duration'] for session in sessions),
-            'exercises_performed': list(set(session['exercise'] for session in sessions)),
-            'sessions_this_week': len([s for s in sessions 
-                                     if (datetime.now() - datetime.fromisoformat(s['timestamp'])).days <= 7])
+            'total_sessions': pose_stats['total_sessions'],
+            'total_reps': pose_stats['total_reps'],
+            'total_duration': pose_stats['total_duration'],
+            'exercises_performed': list(pose_stats['exercises_performed']),
+            'sessions_this_week': len(session_times)
         }
         
         return stats
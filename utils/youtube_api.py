@@ -1,12 +1,135 @@
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import time
+import threading
+from functools import lru_cache
+from types import MappingProxyType
 import streamlit as st
 import json
 
+# Optional: with requests-cache installed, API responses are also kept on
+# disk so they survive restarts and are revalidated with ETags
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# How long and how many API results are kept in memory
+RESULT_CACHE_TTL = 60 * 60
+RESULT_CACHE_MAXSIZE = 256
+RESPONSE_CACHE_PATH = 'data/youtube_cache.sqlite'
+
+# Fallback video recommendations per exercise when the API is not available
+_FALLBACK_VIDEOS = MappingProxyType({
+    'push-ups': (
+        MappingProxyType({
+            'video_id': 'IODxDxX7oi4',
+            'title': 'Perfect Push-Up Form Tutorial',
+            'description': 'Learn proper push-up technique with this comprehensive guide...',
+            'thumbnail': 'https://img.youtube.com/vi/IODxDxX7oi4/mqdefault.jpg',
+            'channel': 'Athlean-X',
+            'url': 'https://www.youtube.com/watch?v=IODxDxX7oi4',
+            'embed_url': 'https://www.youtube.com/embed/IODxDxX7oi4'
+        }),
+    ),
+    'squats': (
+        MappingProxyType({
+            'video_id': 'YaXPRqUwItQ',
+            'title': 'How to Squat Properly - Squat Tutorial',
+            'description': 'Master the perfect squat form with this detailed tutorial...',
+            'thumbnail': 'https://img.youtube.com/vi/YaXPRqUwItQ/mqdefault.jpg',
+            'channel': 'Athlean-X',
+            'url': 'https://www.youtube.com/watch?v=YaXPRqUwItQ',
+            'embed_url': 'https://www.youtube.com/embed/YaXPRqUwItQ'
+        }),
+    ),
+    'plank': (
+        MappingProxyType({
+            'video_id': 'pvIjsG5Svck',
+            'title': 'How to Plank Correctly',
+            'description': 'Perfect your plank form with these essential tips...',
+            'thumbnail': 'https://img.youtube.com/vi/pvIjsG5Svck/mqdefault.jpg',
+            'channel': 'Calisthenic Movement',
+            'url': 'https://www.youtube.com/watch?v=pvIjsG5Svck',
+            'embed_url': 'https://www.youtube.com/embed/pvIjsG5Svck'
+        }),
+    ),
+    'burpees': (
+        MappingProxyType({
+            'video_id': 'TU8QYVW0gDU',
+            'title': 'How to do a Burpee - Proper Form',
+            'description': 'Learn the correct burpee technique for maximum effectiveness...',
+            'thumbnail': 'https://img.youtube.com/vi/TU8QYVW0gDU/mqdefault.jpg',
+            'channel': 'Howcast',
+            'url': 'https://www.youtube.com/watch?v=TU8QYVW0gDU',
+            'embed_url': 'https://www.youtube.com/embed/TU8QYVW0gDU'
+        }),
+    )
+})
+
+@lru_cache(maxsize=256)
+def _fallback_video_key(exercise_name):
+    """Get the _FALLBACK_VIDEOS key matching an exercise name, or None"""
+    # Normalize exercise name for lookup
+    exercise_key = exercise_name.lower().replace('-', '').replace(' ', '')
+    
+    # Find matching videos
+    for key in _FALLBACK_VIDEOS:
+        if key in exercise_key or exercise_key in key:
+            return key
+    return None
+
 class YouTubeAPI:
     def __init__(self):
         self.api_key = os.getenv('YOUTUBE_API_KEY', 'default_key')
         self.base_url = 'https://www.googleapis.com/youtube/v3'
+        
+        # One pooled session so repeat requests reuse the TLS connection
+        self._session = self._create_session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+        
+        # API results by request, as (expiry time, videos), oldest first;
+        # locked since every session's script thread shares this instance
+        self._result_cache = {}
+        self._result_cache_lock = threading.Lock()
+    
+    def _create_session(self):
+        """Create the HTTP session, disk-cached when requests-cache is available"""
+        if requests_cache is None:
+            return requests.Session()
+        
+        # The API key is left out of cache keys and isn't stored on disk
+        return requests_cache.CachedSession(
+            RESPONSE_CACHE_PATH,
+            backend='sqlite',
+            expire_after=RESULT_CACHE_TTL,
+            stale_if_error=True,
+            ignored_parameters=['key']
+        )
+    
+    def _get_cached(self, key):
+        """Get unexpired cached videos for a request, or None"""
+        # With the on-disk HTTP cache it is the only cache layer
+        if requests_cache is not None:
+            return None
+        
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+    
+    def _set_cached(self, key, videos):
+        """Cache videos for a request, dropping the oldest entry when full"""
+        if requests_cache is not None:
+            return
+        
+        with self._result_cache_lock:
+            self._result_cache.pop(key, None)
+            if len(self._result_cache) >= RESULT_CACHE_MAXSIZE:
+                del self._result_cache[next(iter(self._result_cache))]
+            self._result_cache[key] = (time.monotonic() + RESULT_CACHE_TTL, videos)
     
     def search_workout_videos(self, exercise_name, max_results=5):
         """Search for workout videos on YouTube"""
@@ -15,6 +138,11 @@ class YouTubeAPI:
             if self.api_key == 'default_key':
                 return self._get_fallback_videos(exercise_name)
             
+            cache_key = ('search', exercise_name, max_results)
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                return cached
+            
             search_url = f"{self.base_url}/search"
             
             params = {
@@ -28,7 +156,7 @@ class YouTubeAPI:
                 'order': 'relevance'
             }
             
-            response = requests.get(search_url, params=params)
+            response = self._session.get(search_url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -46,6 +174,7 @@ class YouTubeAPI:
                     }
                     videos.append(video)
                 
+                self._set_cached(cache_key, videos)
                 return videos
             else:
                 st.warning(f"YouTube API error: {response.status_code}")
@@ -57,60 +186,9 @@ class YouTubeAPI:
     
     def _get_fallback_videos(self, exercise_name):
         """Fallback video recommendations when API is not available"""
-        fallback_videos = {
-            'push-ups': [
-                {
-                    'video_id': 'IODxDxX7oi4',
-                    'title': 'Perfect Push-Up Form Tutorial',
-                    'description': 'Learn proper push-up technique with this comprehensive guide...',
-                    'thumbnail': 'https://img.youtube.com/vi/IODxDxX7oi4/mqdefault.jpg',
-                    'channel': 'Athlean-X',
-                    'url': 'https://www.youtube.com/watch?v=IODxDxX7oi4',
-                    'embed_url': 'https://www.youtube.com/embed/IODxDxX7oi4'
-                }
-            ],
-            'squats': [
-                {
-                    'video_id': 'YaXPRqUwItQ',
-                    'title': 'How to Squat Properly - Squat Tutorial',
-                    'description': 'Master the perfect squat form with this detailed tutorial...',
-                    'thumbnail': 'https://img.youtube.com/vi/YaXPRqUwItQ/mqdefault.jpg',
-                    'channel': 'Athlean-X',
-                    'url': 'https://www.youtube.com/watch?v=YaXPRqUwItQ',
-                    'embed_url': 'https://www.youtube.com/embed/YaXPRqUwItQ'
-                }
-            ],
-            'plank': [
-                {
-                    'video_id': 'pvIjsG5Svck',
-                    'title': 'How to Plank Correctly',
-                    'description': 'Perfect your plank form with these essential tips...',
-                    'thumbnail': 'https://img.youtube.com/vi/pvIjsG5Svck/mqdefault.jpg',
-                    'channel': 'Calisthenic Movement',
-                    'url': 'https://www.youtube.com/watch?v=pvIjsG5Svck',
-                    'embed_url': 'https://www.youtube.com/embed/pvIjsG5Svck'
-                }
-            ],
-            'burpees': [
-                {
-                    'video_id': 'TU8QYVW0gDU',
-                    'title': 'How to do a Burpee - Proper Form',
-                    'description': 'Learn the correct burpee technique for maximum effectiveness...',
-                    'thumbnail': 'https://img.youtube.com/vi/TU8QYVW0gDU/mqdefault.jpg',
-                    'channel': 'Howcast',
-                    'url': 'https://www.youtube.com/watch?v=TU8QYVW0gDU',
-                    'embed_url': 'https://www.youtube.com/embed/TU8QYVW0gDU'
-                }
-            ]
-        }
-        
-        # Normalize exercise name for lookup
-        exercise_key = exercise_name.lower().replace('-', '').replace(' ', '')
-        
-        # Find matching videos
-        for key, videos in fallback_videos.items():
-            if key in exercise_key or exercise_key in key:
-                return videos
+        key = _fallback_video_key(exercise_name)
+        if key is not None:
+            return [dict(video) for video in _FALLBACK_VIDEOS[key]]
         
         # Default fallback
         return [{
@@ -129,6 +207,11 @@ class YouTubeAPI:
             if self.api_key == 'default_key':
                 return []
             
+            cache_key = ('playlist', playlist_id, max_results)
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                return cached
+            
             playlist_url = f"{self.base_url}/playlistItems"
             
             params = {
@@ -138,7 +221,7 @@ class YouTubeAPI:
                 'key': self.api_key
             }
             
-            response = requests.get(playlist_url, params=params)
+            response = self._session.get(playlist_url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -156,6 +239,7 @@ class YouTubeAPI:
                     }
                     videos.append(video)
                 
+                self._set_cached(cache_key, videos)
                 return videos
             else:
                 return []